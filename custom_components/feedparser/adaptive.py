@@ -0,0 +1,111 @@
+"""Scan interval adapting to how often the feed changes."""
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from feedparser import FeedParserDict
+
+# weight of the latest observation in the average rate of new entries
+RATE_SMOOTHING = 0.3
+BACKOFF_FACTOR = 2
+MAX_BACKOFF_STEPS = 6
+SY_UPDATE_PERIODS = {
+    "hourly": 3600,
+    "daily": 86400,
+    "weekly": 7 * 86400,
+    "monthly": 30 * 86400,
+    "yearly": 365 * 86400,
+}
+MAX_AGE_PATTERN = re.compile(r"(?:^|[,\s])max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+
+def feed_update_period(parsed_feed: FeedParserDict) -> float | None:
+    """Return the update period in seconds announced by the feed.
+
+    The period is taken from the RSS `ttl` element and the `sy:updatePeriod` and
+    `sy:updateFrequency` elements of the syndication module. If both are given,
+    the longer period is returned.
+    """
+    periods = []
+    feed = parsed_feed.get("feed", {})
+    try:
+        if ttl := feed.get("ttl"):
+            periods.append(int(ttl) * 60)
+        if update_period := SY_UPDATE_PERIODS.get(
+            feed.get("sy_updateperiod", "").strip().lower(),
+        ):
+            periods.append(update_period / int(feed.get("sy_updatefrequency") or 1))
+    except (ValueError, ZeroDivisionError):
+        return None
+    return max(periods, default=None)
+
+
+def cache_max_age(headers: Mapping[str, str]) -> int | None:
+    """Return max-age of the Cache-Control response header in seconds."""
+    if match := MAX_AGE_PATTERN.search(headers.get("Cache-Control", "")):
+        return int(match[1])
+    return None
+
+
+class AdaptiveInterval:
+    """Scan interval following the rate of new entries in the feed.
+
+    The interval is the average time between two new entries, learned from the
+    entries appearing in the feed. Until the rate is known, the configured scan
+    interval is used. The feed is not polled more often than the update period it
+    announces and the max-age of its responses allow. While the feed does not
+    change, the interval is doubled after each poll. The result is bounded by the
+    minimum and maximum interval.
+    """
+
+    def __init__(
+        self: AdaptiveInterval,
+        scan_interval: float,
+        min_interval: float,
+        max_interval: float,
+    ) -> None:
+        """Initialize the adaptive interval, the intervals are in seconds."""
+        self.scan_interval = scan_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.update_period: float | None = None
+        self.max_age: float | None = None
+        # average number of new entries per second
+        self.entry_rate: float | None = None
+        self.unchanged_polls = 0
+        self._last_change: float | None = None
+
+    def __repr__(self: AdaptiveInterval) -> str:
+        """Return the representation."""
+        return (
+            f"AdaptiveInterval(interval={self.interval}, "
+            f"entry_rate={self.entry_rate}, unchanged_polls={self.unchanged_polls})"
+        )
+
+    def observe(self: AdaptiveInterval, now: float, new_entries: int) -> None:
+        """Record the number of new entries found by the poll at the given time."""
+        if not new_entries:
+            self.unchanged_polls += 1
+            return
+        if self._last_change is not None:
+            rate = new_entries / max(now - self._last_change, 1)
+            self.entry_rate = (
+                rate
+                if self.entry_rate is None
+                else RATE_SMOOTHING * rate + (1 - RATE_SMOOTHING) * self.entry_rate
+            )
+        # the entries found by the first poll give no rate, they are the baseline
+        self._last_change = now
+        self.unchanged_polls = 0
+
+    @property
+    def interval(self: AdaptiveInterval) -> float:
+        """Return seconds until the next poll."""
+        interval = 1 / self.entry_rate if self.entry_rate else self.scan_interval
+        interval = max(interval, self.update_period or 0, self.max_age or 0)
+        interval *= BACKOFF_FACTOR ** min(self.unchanged_polls, MAX_BACKOFF_STEPS)
+        return min(max(interval, self.min_interval), self.max_interval)
@@ -0,0 +1,82 @@
+"""Circuit breaker stopping the polls of a failing feed."""
+from __future__ import annotations
+
+import logging
+from enum import StrEnum
+
+FAILURE_THRESHOLD = 5
+BACKOFF_BASE = 60.0
+DEFAULT_COOLDOWN = 3600.0
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class BreakerState(StrEnum):
+    """State of the circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Back off exponentially from a failing feed and stop polling a dead one.
+
+    After a failed fetch, the next fetch is allowed after BACKOFF_BASE seconds,
+    doubled with each consecutive failure. After FAILURE_THRESHOLD consecutive
+    failures the breaker opens and no fetch is allowed for the cooldown. Then one
+    trial fetch is allowed in the half-open state, its success closes the breaker,
+    its failure opens the breaker again.
+
+    The times are timestamps in seconds.
+    """
+
+    def __init__(
+        self: CircuitBreaker,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        backoff_base: float = BACKOFF_BASE,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.backoff_base = backoff_base
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.retry_at: float | None = None
+
+    def __repr__(self: CircuitBreaker) -> str:
+        """Return the representation."""
+        return (
+            f"CircuitBreaker(state={self.state}, failures={self.failures}, "
+            f"retry_at={self.retry_at})"
+        )
+
+    def allow_request(self: CircuitBreaker, now: float) -> bool:
+        """Return whether the feed can be fetched at the given time."""
+        if self.retry_at is not None and now < self.retry_at:
+            return False
+        if self.state == BreakerState.OPEN:
+            self.state = BreakerState.HALF_OPEN
+        return True
+
+    def record_success(self: CircuitBreaker) -> None:
+        """Close the breaker after a successful fetch."""
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.retry_at = None
+
+    def record_failure(
+        self: CircuitBreaker,
+        now: float,
+        cooldown: float = DEFAULT_COOLDOWN,
+    ) -> None:
+        """Delay the next fetch after a failed one, open the breaker if needed."""
+        self.failures += 1
+        if (
+            self.state == BreakerState.HALF_OPEN
+            or self.failures >= self.failure_threshold
+        ):
+            self.state = BreakerState.OPEN
+            self.retry_at = now + cooldown
+        else:
+            backoff = self.backoff_base * 2 ** (self.failures - 1)
+            self.retry_at = now + min(backoff, cooldown)
@@ -0,0 +1,548 @@
+"""Coordinator sharing the feed download among the sensors of the same feed."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import TYPE_CHECKING, NamedTuple
+from urllib.parse import urlparse
+
+import aiohttp
+import feedparser  # type: ignore[import]
+import requests
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.util import dt
+
+from .adaptive import cache_max_age
+from .breaker import DEFAULT_COOLDOWN, CircuitBreaker
+from .metrics import UpdateMetrics
+from .stream import CHUNK_SIZE, ContentReader, FeedTooLargeError
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from datetime import timedelta
+
+    from feedparser import FeedParserDict
+    from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.entity import Entity
+
+    from .pool import SessionPool
+
+DEFAULT_CONNECT_TIMEOUT = 10.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class FetchOptions(NamedTuple):
+    """Options of a sensor affecting how its feed is fetched."""
+
+    scan_interval: timedelta
+    # stop reading the feed after this number of entries, None reads all of them
+    max_entries: int | None
+    max_size: int | None
+    # feeds of at least this size are processed in a worker process
+    process_pool_threshold: int | None = None
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    # seconds the feed is not fetched after the circuit breaker opened
+    breaker_cooldown: float = DEFAULT_COOLDOWN
+
+    def offloads(self: FetchOptions, size: int) -> bool:
+        """Return whether a feed of the given size is processed in a worker process."""
+        return bool(self.process_pool_threshold) and size >= self.process_pool_threshold
+
+
+@dataclass
+class FeedData:
+    """Feed document shared by the sensors.
+
+    The document is parsed by `FeedCoordinator.parse` when the first sensor
+    processing it in-process needs it, so `parsed_feed` stays None while only
+    the sensors processing it in a worker process got it.
+    """
+
+    content: bytes
+    content_type: str
+    fingerprint: bytes
+    # the document was cut after this number of entries, None if read completely
+    max_entries: int | None = None
+    parsed_feed: FeedParserDict | None = None
+
+    @property
+    def size(self: FeedData) -> int:
+        """Return size of the feed document in bytes."""
+        return len(self.content)
+
+
+class _FetchRequest(NamedTuple):
+    """Request of the feed prepared while the state of the coordinator is locked."""
+
+    headers: dict[str, str]
+    timeouts: tuple[float, float]
+    reader: ContentReader
+
+
+class _FetchResponse(NamedTuple):
+    """Response to the request of the feed."""
+
+    headers: Mapping[str, str]
+    not_modified: bool = False
+    # reader of the feed document, None if the feed was not read
+    reader: ContentReader | None = None
+
+
+def parse_feed(content: bytes, content_type: str) -> FeedParserDict:
+    """Parse the raw feed document."""
+    # pass the raw document to feedparser, it detects the encoding itself
+    # from the declared content type and the XML declaration
+    return feedparser.parse(content, response_headers={"content-type": content_type})
+
+
+class FeedCoordinator:
+    """Fetch and parse the feed once for all the sensors configured with its URL.
+
+    A sensor gets the feed fetched for another sensor if it did not get it yet, the
+    feed is not older than the shortest scan interval of the sensors and it was not
+    cut before the entries the sensor shows. Otherwise the feed is fetched again.
+    When a changed feed document is fetched, the other sensors are asked to update,
+    so they follow the shortest scan interval. The document is dropped once all the
+    sensors got it, only its fingerprint and validators are kept.
+
+    The feed is fetched with conditional requests, an unchanged feed document is not
+    parsed again.
+    """
+
+    def __init__(
+        self: FeedCoordinator,
+        url: str,
+        session_pool: SessionPool,
+        request_headers: Mapping[str, str],
+    ) -> None:
+        """Initialize the coordinator."""
+        self.url = url
+        self._session_pool = session_pool
+        self._request_headers = request_headers
+        self._sensors: dict[Entity, FetchOptions] = {}
+        # sensors which already got the current feed
+        self._consumers: set[Entity] = set()
+        # sensors which got the feed of the validators or restored it
+        self._current: set[Entity] = set()
+        self._fetched_at: float | None = None
+        self._etag: str | None = None
+        self._last_modified: str | None = None
+        # guards the state of the coordinator, it is not held while the feed is
+        # fetched, the sensors wait for the running fetch on the condition
+        self._lock = threading.Lock()
+        self._fetch_done = threading.Condition(self._lock)
+        self._fetching = False
+        self._parse_lock = threading.Lock()
+        # lets a single coroutine at a time wait for the fetch in an executor thread
+        self._async_lock = asyncio.Lock()
+        self.data: FeedData | None = None
+        self.fingerprint: bytes | None = None
+        self.fetch_count = 0
+        self.parse_count = 0
+        # max-age of the last response in seconds
+        self.max_age: int | None = None
+        self.breaker = CircuitBreaker()
+
+    def __repr__(self: FeedCoordinator) -> str:
+        """Return the representation."""
+        return f'FeedCoordinator(url="{self.url}", sensors={len(self._sensors)})'
+
+    def register(self: FeedCoordinator, sensor: Entity, options: FetchOptions) -> None:
+        """Register sensor using the feed."""
+        with self._lock:
+            self._sensors[sensor] = options
+
+    def unregister(self: FeedCoordinator, sensor: Entity) -> None:
+        """Unregister sensor no longer using the feed."""
+        with self._lock:
+            self._sensors.pop(sensor, None)
+            self._consumers.discard(sensor)
+            self._current.discard(sensor)
+
+    def forget(self: FeedCoordinator, sensor: Entity) -> None:
+        """Forget the sensor got the feed, so it gets the whole document again."""
+        with self._lock:
+            self._consumers.discard(sensor)
+            self._current.discard(sensor)
+
+    def restore_validators(
+        self: FeedCoordinator,
+        sensor: Entity,
+        etag: str | None,
+        last_modified: str | None,
+    ) -> None:
+        """Restore validators of the feed the sensor restored from its snapshot.
+
+        Before the feed is fetched, conditional requests are sent only if all
+        the sensors of the feed restored it with the same validators.
+        """
+        with self._lock:
+            if self.fingerprint is not None:
+                return
+            if not self._current:
+                self._etag, self._last_modified = etag, last_modified
+            if (etag, last_modified) == self.validators:
+                self._current.add(sensor)
+
+    @property
+    def validators(self: FeedCoordinator) -> tuple[str | None, str | None]:
+        """Return ETag and Last-Modified header of the feed."""
+        return self._etag, self._last_modified
+
+    @property
+    def has_sensors(self: FeedCoordinator) -> bool:
+        """Return whether any sensor uses the feed."""
+        return bool(self._sensors)
+
+    @property
+    def update_interval(self: FeedCoordinator) -> timedelta | None:
+        """Return the shortest scan interval of the sensors."""
+        return min((o.scan_interval for o in self._sensors.values()), default=None)
+
+    def fetch(
+        self: FeedCoordinator,
+        sensor: Entity,
+        metrics: UpdateMetrics | None = None,
+    ) -> FeedData | None:
+        """Return the feed for the sensor, fetch it unless the shared one is fresh.
+
+        Duration of the fetch is recorded in the metrics, as well as whether the
+        feed was not modified.
+        """
+        with self._lock:
+            self._fetch_done.wait_for(lambda: not self._fetching)
+            request = self._begin_fetch(sensor)
+            if request is None:
+                return self._consume(sensor)
+        try:
+            result: _FetchResponse | Exception = self._get(
+                request,
+                metrics or UpdateMetrics(),
+            )
+        except requests.RequestException as err:
+            result = err
+        except BaseException:
+            self._abort_fetch()
+            raise
+        return self._end_fetch(sensor, result)
+
+    async def async_fetch(
+        self: FeedCoordinator,
+        hass: HomeAssistant,
+        sensor: Entity,
+        metrics: UpdateMetrics | None = None,
+    ) -> FeedData | None:
+        """Return the feed for the sensor, fetch it with aiohttp if needed."""
+        if urlparse(self.url).scheme == "file":
+            # aiohttp can not read local files, fall back to the requests session
+            return await hass.async_add_executor_job(self.fetch, sensor, metrics)
+        async with self._async_lock:
+            while True:
+                # the lock is held only while the state changes, not during fetches
+                with self._lock:
+                    if not self._fetching:
+                        request = self._begin_fetch(sensor)
+                        if request is None:
+                            return self._consume(sensor)
+                        break
+                # wait for the fetch of a sensor updating in an executor thread
+                await hass.async_add_executor_job(self._wait_fetch_done)
+            try:
+                result: _FetchResponse | Exception = await self._async_get(
+                    hass,
+                    request,
+                    metrics or UpdateMetrics(),
+                )
+            except (aiohttp.ClientError, TimeoutError) as err:
+                result = err
+            except BaseException:
+                self._abort_fetch()
+                raise
+            return await hass.async_add_executor_job(self._end_fetch, sensor, result)
+
+    def parse(
+        self: FeedCoordinator,
+        data: FeedData,
+        metrics: UpdateMetrics | None = None,
+    ) -> FeedParserDict:
+        """Return the parsed feed document, parse it once for all the sensors.
+
+        Duration of the parse is recorded in the metrics.
+        """
+        with self._parse_lock:
+            if data.parsed_feed is None:
+                with (metrics or UpdateMetrics()).timed("parse"):
+                    data.parsed_feed = parse_feed(data.content, data.content_type)
+                self.parse_count += 1
+            return data.parsed_feed
+
+    def _consume(self: FeedCoordinator, sensor: Entity) -> FeedData | None:
+        """Return the feed to the sensor unless it lacks entries the sensor shows.
+
+        The feed is dropped once all the sensors got it, the sensors keep only the
+        entries they show.
+        """
+        self._consumers.add(sensor)
+        data = self.data
+        if data is None or not self._has_entries_for(sensor, data):
+            return None
+        self._current.add(sensor)
+        if self._sensors.keys() <= self._consumers:
+            self.data = None
+        return data
+
+    def _has_entries_for(self: FeedCoordinator, sensor: Entity, data: FeedData) -> bool:
+        """Return whether the document has all the entries the sensor reads."""
+        if data.max_entries is None:
+            return True
+        options = self._sensors.get(sensor)
+        return bool(
+            options and options.max_entries and options.max_entries <= data.max_entries,
+        )
+
+    def _allow_fetch(self: FeedCoordinator) -> bool:
+        """Return whether the circuit breaker allows fetching the feed."""
+        if self.breaker.allow_request(time.time()):
+            return True
+        _LOGGER.debug(
+            "Feed %s: Not fetched before %s after %s failures, %s",
+            self.url,
+            dt.utc_from_timestamp(self.breaker.retry_at),  # type: ignore[arg-type]
+            self.breaker.failures,
+            "keeping the last feed" if self.fingerprint else "no feed available",
+        )
+        return False
+
+    def _fetch_failed(self: FeedCoordinator, err: Exception) -> None:
+        """Delay the next fetch of the feed after the failed one."""
+        self.breaker.record_failure(
+            time.time(),
+            min(
+                (o.breaker_cooldown for o in self._sensors.values()),
+                default=DEFAULT_COOLDOWN,
+            ),
+        )
+        _LOGGER.warning(
+            "Feed %s: Unable to fetch the feed (%s failures, circuit breaker %s): %s",
+            self.url,
+            self.breaker.failures,
+            self.breaker.state,
+            err,
+        )
+
+    def _timeouts(self: FeedCoordinator) -> tuple[float, float]:
+        """Return the longest connect and read timeout of the sensors."""
+        options = self._sensors.values()
+        return (
+            max((o.connect_timeout for o in options), default=DEFAULT_CONNECT_TIMEOUT),
+            max((o.read_timeout for o in options), default=DEFAULT_READ_TIMEOUT),
+        )
+
+    def _is_fresh_for(self: FeedCoordinator, sensor: Entity) -> bool:
+        if (
+            self.data is None
+            or self._fetched_at is None
+            or sensor in self._consumers
+            or not self._has_entries_for(sensor, self.data)
+            or (update_interval := self.update_interval) is None
+        ):
+            return False
+        return time.monotonic() - self._fetched_at < update_interval.total_seconds()
+
+    def _begin_fetch(self: FeedCoordinator, sensor: Entity) -> _FetchRequest | None:
+        """Return request of the feed unless the sensor gets the shared feed.
+
+        Called with the lock held while no other fetch runs, the other sensors wait
+        until the requested feed is passed to `_end_fetch`.
+        """
+        if self._is_fresh_for(sensor) or not self._allow_fetch():
+            return None
+        self._fetching = True
+        return _FetchRequest(
+            headers=self._conditional_headers(),
+            timeouts=self._timeouts(),
+            reader=self._content_reader(),
+        )
+
+    def _end_fetch(
+        self: FeedCoordinator,
+        sensor: Entity,
+        result: _FetchResponse | Exception,
+    ) -> FeedData | None:
+        """Share the fetched feed or record the failure, return the feed to sensor."""
+        with self._lock:
+            try:
+                if isinstance(result, Exception):
+                    self._fetch_failed(result)
+                else:
+                    self._process_response(sensor, result)
+                    self.breaker.record_success()
+            finally:
+                self._fetch_finished()
+            return self._consume(sensor)
+
+    def _abort_fetch(self: FeedCoordinator) -> None:
+        """Let the other sensors fetch the feed after the fetch was interrupted."""
+        with self._lock:
+            self._fetch_finished()
+
+    def _fetch_finished(self: FeedCoordinator) -> None:
+        self._fetching = False
+        self._fetch_done.notify_all()
+
+    def _wait_fetch_done(self: FeedCoordinator) -> None:
+        with self._lock:
+            self._fetch_done.wait_for(lambda: not self._fetching)
+
+    def _get(
+        self: FeedCoordinator,
+        request: _FetchRequest,
+        metrics: UpdateMetrics,
+    ) -> _FetchResponse:
+        reader = request.reader
+        with metrics.timed("fetch"), self._session_pool.session(self.url) as s, s.get(
+            self.url,
+            headers=request.headers,
+            stream=True,
+            timeout=request.timeouts,
+        ) as res:
+            if res.status_code == HTTPStatus.NOT_MODIFIED:
+                metrics.not_modified = True
+                return _FetchResponse(res.headers, not_modified=True)
+            res.raise_for_status()
+            try:
+                reader.check_size(res.headers.get("Content-Length"))
+                for chunk in res.iter_content(chunk_size=CHUNK_SIZE):
+                    if reader.feed(chunk):
+                        break
+            except FeedTooLargeError as err:
+                _LOGGER.warning("Feed %s: %s", self.url, err)
+                return _FetchResponse(res.headers)
+            finally:
+                metrics.bytes_downloaded = reader.size
+        return _FetchResponse(res.headers, reader=reader)
+
+    async def _async_get(
+        self: FeedCoordinator,
+        hass: HomeAssistant,
+        request: _FetchRequest,
+        metrics: UpdateMetrics,
+    ) -> _FetchResponse:
+        reader = request.reader
+        session = async_get_clientsession(hass)
+        connect_timeout, read_timeout = request.timeouts
+        with metrics.timed("fetch"):
+            async with session.get(
+                self.url,
+                headers=self._request_headers | request.headers,
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout,
+                    sock_read=read_timeout,
+                ),
+            ) as res:
+                if res.status == HTTPStatus.NOT_MODIFIED:
+                    metrics.not_modified = True
+                    return _FetchResponse(res.headers, not_modified=True)
+                res.raise_for_status()
+                try:
+                    reader.check_size(res.content_length)
+                    async for chunk in res.content.iter_chunked(CHUNK_SIZE):
+                        if reader.feed(chunk):
+                            break
+                except FeedTooLargeError as err:
+                    _LOGGER.warning("Feed %s: %s", self.url, err)
+                    return _FetchResponse(res.headers)
+                finally:
+                    metrics.bytes_downloaded = reader.size
+        return _FetchResponse(res.headers, reader=reader)
+
+    def _process_response(
+        self: FeedCoordinator,
+        sensor: Entity,
+        response: _FetchResponse,
+    ) -> None:
+        """Update the state of the coordinator from the response to the request."""
+        self.fetch_count += 1
+        self.max_age = cache_max_age(response.headers)
+        if response.not_modified:
+            _LOGGER.debug("Feed %s: Feed not modified since last update", self.url)
+            self._fetched()
+        elif response.reader is not None:
+            self._process_content(sensor, response.reader, response.headers)
+
+    def _content_reader(self: FeedCoordinator) -> ContentReader:
+        """Return reader collecting the feed document for all the sensors."""
+        options = self._sensors.values()
+        max_entries = None
+        if options and all(o.max_entries for o in options):
+            # stop reading the feed once the entries of all the sensors were received
+            max_entries = max(o.max_entries for o in options)  # type: ignore[type-var]
+        max_size = None
+        if options and all(o.max_size for o in options):
+            max_size = max(o.max_size for o in options)  # type: ignore[type-var]
+        return ContentReader(max_entries=max_entries, max_size=max_size)
+
+    def _conditional_headers(self: FeedCoordinator) -> dict[str, str]:
+        """Return headers of a conditional request for the already fetched feed.
+
+        The request is conditional only if each sensor got the feed, or can get
+        the kept document with all its entries when the feed is not modified.
+        """
+        headers = {}
+        if not all(
+            sensor in self._current
+            or (self.data is not None and self._has_entries_for(sensor, self.data))
+            for sensor in self._sensors
+        ):
+            return headers
+        if self._etag:
+            headers["If-None-Match"] = self._etag
+        if self._last_modified:
+            headers["If-Modified-Since"] = self._last_modified
+        return headers
+
+    def _process_content(
+        self: FeedCoordinator,
+        sensor: Entity,
+        reader: ContentReader,
+        headers: Mapping[str, str],
+    ) -> None:
+        """Share the downloaded feed document unless it did not change."""
+        content = reader.content
+        fingerprint = hashlib.blake2b(content, digest_size=16).digest()
+        if self.data and fingerprint == self.data.fingerprint:
+            _LOGGER.debug("Feed %s: Feed content did not change", self.url)
+        else:
+            # a document equal to the dropped one is shared again without notifying
+            # the sensors, they already got it
+            self.data = FeedData(
+                content=content,
+                content_type=headers.get("Content-Type", ""),
+                fingerprint=fingerprint,
+                max_entries=reader.cut_after,
+            )
+            if fingerprint != self.fingerprint:
+                self.fingerprint = fingerprint
+                self._current.clear()
+                self._notify_sensors(sensor)
+        self._etag = headers.get("ETag")
+        self._last_modified = headers.get("Last-Modified")
+        self._fetched()
+
+    def _fetched(self: FeedCoordinator) -> None:
+        self._fetched_at = time.monotonic()
+        self._consumers.clear()
+
+    def _notify_sensors(self: FeedCoordinator, sensor: Entity) -> None:
+        """Ask the other sensors of the feed to update with the new feed."""
+        for other in self._sensors:
+            if other is not sensor and other.hass and other.entity_id:
+                other.schedule_update_ha_state(force_refresh=True)
@@ -0,0 +1,126 @@
+"""Compact representation of the sensor entries kept in memory."""
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator, Mapping
+from typing import Any
+
+# key tuples shared by the entries with the same keys, bounded as the keys come
+# from the feeds
+MAX_KEY_TUPLES = 1024
+
+_KEY_TUPLES: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+
+class CompactEntry(Mapping[str, Any]):
+    """Read-only sensor entry storing its values in a tuple.
+
+    The keys are kept in a tuple shared by all the entries with the same keys, the
+    key names are interned. Nested dicts are stored as compact entries and lists as
+    tuples, so the entry holds no feedparser objects. `as_dict` converts the entry
+    back to plain dicts and lists.
+    """
+
+    __slots__ = ("_keys", "_values")
+
+    def __init__(
+        self: CompactEntry,
+        keys: tuple[str, ...],
+        values: tuple[Any, ...],
+    ) -> None:
+        """Initialize the entry, the values are already compact."""
+        self._keys = keys
+        self._values = values
+
+    def __repr__(self: CompactEntry) -> str:
+        """Return the representation."""
+        return f"CompactEntry({self.as_dict()})"
+
+    def __getitem__(self: CompactEntry, key: str) -> Any:  # noqa: ANN401
+        """Return value of the key."""
+        try:
+            return self._values[self._keys.index(key)]
+        except ValueError:
+            raise KeyError(key) from None
+
+    def __iter__(self: CompactEntry) -> Iterator[str]:
+        """Iterate over the keys."""
+        return iter(self._keys)
+
+    def __len__(self: CompactEntry) -> int:
+        """Return number of the keys."""
+        return len(self._keys)
+
+    def __eq__(self: CompactEntry, other: object) -> bool:
+        """Return whether the entry has the same items as the other mapping."""
+        if isinstance(other, CompactEntry):
+            return self._keys == other._keys and self._values == other._values
+        if isinstance(other, Mapping):
+            return self.as_dict() == other
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __getstate__(self: CompactEntry) -> tuple[tuple[str, ...], tuple[Any, ...]]:
+        """Return the state to be pickled."""
+        return self._keys, self._values
+
+    def __setstate__(
+        self: CompactEntry,
+        state: tuple[tuple[str, ...], tuple[Any, ...]],
+    ) -> None:
+        """Restore the pickled state, share the keys with the other entries."""
+        keys, self._values = state
+        self._keys = _shared_keys(keys)
+
+    def as_dict(self: CompactEntry) -> dict[str, Any]:
+        """Return the entry as a plain dict."""
+        return dict(zip(self._keys, map(_materialize, self._values), strict=True))
+
+
+def compact_entry(
+    entry: Mapping[str, Any],
+    strings: dict[str, str] | None = None,
+) -> CompactEntry:
+    """Return compact copy of the entry.
+
+    Equal strings are stored once within the `strings` pool, pass the same pool
+    when compacting the entries of a feed to share e.g. the base URLs and content
+    types repeated in each entry.
+    """
+    if strings is None:
+        strings = {}
+    return CompactEntry(
+        _shared_keys(tuple(entry)),
+        tuple(_compact(value, strings) for value in entry.values()),
+    )
+
+
+def _shared_keys(keys: tuple[str, ...]) -> tuple[str, ...]:
+    """Return the key tuple shared by the entries with the same keys."""
+    if shared_keys := _KEY_TUPLES.get(keys):
+        return shared_keys
+    keys = tuple(map(sys.intern, keys))
+    if len(_KEY_TUPLES) < MAX_KEY_TUPLES:
+        _KEY_TUPLES[keys] = keys
+    return keys
+
+
+def _compact(value: Any, strings: dict[str, str]) -> Any:  # noqa: ANN401
+    if isinstance(value, str):
+        return strings.setdefault(value, value)
+    if isinstance(value, CompactEntry):
+        return value
+    if isinstance(value, Mapping):
+        return compact_entry(value, strings)
+    if isinstance(value, list | tuple):
+        return tuple(_compact(v, strings) for v in value)
+    return value
+
+
+def _materialize(value: Any) -> Any:  # noqa: ANN401
+    if isinstance(value, CompactEntry):
+        return value.as_dict()
+    if isinstance(value, tuple):
+        return [_materialize(v) for v in value]
+    return value
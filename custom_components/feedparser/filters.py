@@ -0,0 +1,119 @@
+"""Filters of whole feed entries by their title, summary and categories."""
+from __future__ import annotations
+
+import re
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from feedparser import FeedParserDict
+
+FILTER_FIELDS = ("title", "summary", "category")
+FILTER_FLAGS = re.IGNORECASE | re.MULTILINE
+
+
+class FilterRule(NamedTuple):
+    """Regular expression searched for in the given fields of the entry."""
+
+    pattern: str
+    fields: tuple[str, ...] = FILTER_FIELDS
+
+    @classmethod
+    def from_config(cls: type[FilterRule], rule: str | Mapping[str, Any]) -> FilterRule:
+        """Return rule configured as a pattern or a mapping with pattern and fields."""
+        if isinstance(rule, Mapping):
+            return cls(rule["pattern"], tuple(rule.get("fields", FILTER_FIELDS)))
+        return cls(rule)
+
+
+class EntryFilter:
+    """Decide whether a feed entry is shown by the include and exclude rules.
+
+    An entry is shown if any include rule matches it, or if there are no include
+    rules, and no exclude rule matches it. The rules are searched for
+    case-insensitively. The patterns of the rules checking the same field are
+    compiled into a single regular expression, so each field of the entry is
+    scanned once for the include and once for the exclude rules. Patterns with
+    groups or global inline flags are compiled on their own, combining them would
+    renumber their groups or misplace their flags.
+    """
+
+    def __init__(
+        self: EntryFilter,
+        include: Iterable[str | Mapping[str, Any]] = (),
+        exclude: Iterable[str | Mapping[str, Any]] = (),
+    ) -> None:
+        """Compile the rules."""
+        self._include = _compile(map(FilterRule.from_config, include))
+        self._exclude = _compile(map(FilterRule.from_config, exclude))
+
+    def __repr__(self: EntryFilter) -> str:
+        """Return the representation."""
+        return f"EntryFilter(include={self._include}, exclude={self._exclude})"
+
+    def __bool__(self: EntryFilter) -> bool:
+        """Return whether there are any rules."""
+        return bool(self._include or self._exclude)
+
+    def matches(self: EntryFilter, feed_entry: FeedParserDict) -> bool:
+        """Return whether the entry passes the filter."""
+        if _search(self._exclude, feed_entry):
+            return False
+        return not self._include or _search(self._include, feed_entry)
+
+
+def _compile(rules: Iterable[FilterRule]) -> dict[str, list[re.Pattern[str]]]:
+    """Return regular expressions of the rules for each field."""
+    combined: dict[str, list[str]] = {}
+    separate: dict[str, list[re.Pattern[str]]] = {}
+    for rule in rules:
+        pattern = re.compile(rule.pattern, FILTER_FLAGS)
+        # groups would be renumbered and global flags misplaced in the combined one
+        combinable = not pattern.groups and _has_scoped_flags(rule.pattern)
+        for field in rule.fields:
+            if combinable:
+                combined.setdefault(field, []).append(f"(?:{rule.pattern})")
+            else:
+                separate.setdefault(field, []).append(pattern)
+    patterns = {
+        field: [re.compile("|".join(field_patterns), FILTER_FLAGS)]
+        for field, field_patterns in combined.items()
+    }
+    for field, field_patterns in separate.items():
+        patterns.setdefault(field, []).extend(field_patterns)
+    return patterns
+
+
+def _has_scoped_flags(pattern: str) -> bool:
+    """Return whether the pattern has no global inline flags, e.g. (?s)."""
+    try:
+        re.compile(f"(?:{pattern})")
+    except re.error:
+        return False
+    return True
+
+
+def _search(
+    patterns: dict[str, list[re.Pattern[str]]],
+    feed_entry: FeedParserDict,
+) -> bool:
+    """Return whether any of the patterns is found in its field of the entry."""
+    for field, field_patterns in patterns.items():
+        text = _field_text(feed_entry, field)
+        if any(pattern.search(text) for pattern in field_patterns):
+            return True
+    return False
+
+
+def _field_text(feed_entry: FeedParserDict, field: str) -> str:
+    """Return text of the entry field the rules are searched for in.
+
+    The categories are on separate lines, so `^` and `$` anchor a single category.
+    """
+    if field == "category":
+        return "\n".join(
+            tag.get("term") or "" for tag in dict.get(feed_entry, "tags", ())
+        )
+    return dict.get(feed_entry, field) or ""
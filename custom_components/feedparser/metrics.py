@@ -0,0 +1,90 @@
+"""Timing of the stages of the feedparser sensor updates."""
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Generator
+
+    from homeassistant.helpers.entity import Entity
+
+    MetricsListener = Callable[[Entity, "UpdateMetrics"], None]
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+STAGES = ("fetch", "parse", "generate", "total")
+
+_LISTENERS: list[MetricsListener] = []
+
+
+@dataclass
+class UpdateMetrics:
+    """Durations of the stages of a sensor update in seconds.
+
+    A stage which did not run in the update is None, e.g. `fetch` and `parse` when
+    the sensor got the feed already fetched for another sensor of the same feed.
+    The parse counts are the totals of the sensor since it was created.
+    """
+
+    fetch: float | None = None
+    parse: float | None = None
+    generate: float | None = None
+    total: float | None = None
+    bytes_downloaded: int = 0
+    # the server responded the feed was not modified
+    not_modified: bool = False
+    entries: int = 0
+    full_parse_count: int = 0
+    skipped_parse_count: int = 0
+
+    @contextmanager
+    def timed(self: UpdateMetrics, stage: str) -> Generator[None, None, None]:
+        """Record duration of the stage run in the context."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            setattr(self, stage, time.perf_counter() - start)
+
+    def add_fetches(self: UpdateMetrics, fetches: list[UpdateMetrics]) -> None:
+        """Record the fetches and parses of feeds fetched concurrently.
+
+        The fetch takes as long as the longest fetch, the parses and the downloaded
+        bytes are summed up.
+        """
+        fetch = [m.fetch for m in fetches if m.fetch is not None]
+        parse = [m.parse for m in fetches if m.parse is not None]
+        self.fetch = max(fetch) if fetch else None
+        self.parse = sum(parse) if parse else None
+        self.bytes_downloaded = sum(m.bytes_downloaded for m in fetches)
+        self.not_modified = bool(fetches) and all(m.not_modified for m in fetches)
+
+    def as_dict(self: UpdateMetrics) -> dict[str, Any]:
+        """Return the metrics with the durations in milliseconds."""
+        metrics = asdict(self)
+        for stage in STAGES:
+            duration = metrics.pop(stage)
+            metrics[f"{stage}_ms"] = None if duration is None else duration * 1000
+        return metrics
+
+
+def add_metrics_listener(listener: MetricsListener) -> Callable[[], None]:
+    """Call the listener with the metrics of each sensor update.
+
+    Return function removing the listener.
+    """
+    _LISTENERS.append(listener)
+    return lambda: _LISTENERS.remove(listener)
+
+
+def publish_metrics(sensor: Entity, metrics: UpdateMetrics) -> None:
+    """Pass the metrics of the sensor update to the listeners."""
+    for listener in list(_LISTENERS):
+        try:
+            listener(sensor, metrics)
+        except Exception:
+            _LOGGER.exception("Error in metrics listener %s", listener)
@@ -0,0 +1,135 @@
+"""Pool of HTTP sessions shared by the feedparser sensors."""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests_file import FileAdapter
+
+if TYPE_CHECKING:
+    from collections.abc import Generator, Mapping
+
+DEFAULT_MAX_CONNECTIONS_PER_HOST = 4
+DEFAULT_IDLE_TIMEOUT = 300.0
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledSession:
+    """Session kept in the pool together with its usage bookkeeping."""
+
+    session: requests.Session
+    last_used: float
+    in_use: int = field(default=0)
+
+
+class SessionPool:
+    """Keep one keep-alive requests session per host.
+
+    Sensors fetching feeds from the same host share the session and its
+    connections. Each session holds at most `max_connections_per_host` connections,
+    further requests wait for a free connection. Sessions which were not used for
+    `idle_timeout` seconds are closed and removed from the pool.
+    """
+
+    def __init__(
+        self: SessionPool,
+        headers: Mapping[str, str],
+        max_connections_per_host: int = DEFAULT_MAX_CONNECTIONS_PER_HOST,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        """Initialize the session pool."""
+        self._headers = headers
+        self._max_connections_per_host = max_connections_per_host
+        self._idle_timeout = idle_timeout
+        self._sessions: dict[str, _PooledSession] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __repr__(self: SessionPool) -> str:
+        """Return the representation."""
+        return (
+            f"SessionPool(max_connections_per_host={self._max_connections_per_host}, "
+            f"idle_timeout={self._idle_timeout}, sessions={len(self._sessions)})"
+        )
+
+    @contextmanager
+    def session(
+        self: SessionPool,
+        url: str,
+    ) -> Generator[requests.Session, None, None]:
+        """Borrow the session for the host of the given URL."""
+        key = self._key(url)
+        with self._lock:
+            self._evict_idle(time.monotonic())
+            pooled = self._sessions.get(key)
+            if pooled:
+                self.hits += 1
+            else:
+                self.misses += 1
+                pooled = self._sessions[key] = _PooledSession(
+                    session=self._create_session(),
+                    last_used=time.monotonic(),
+                )
+                _LOGGER.debug("Created new HTTP session for %s", key)
+            pooled.in_use += 1
+        try:
+            yield pooled.session
+        finally:
+            with self._lock:
+                pooled.in_use -= 1
+                pooled.last_used = time.monotonic()
+
+    @property
+    def stats(self: SessionPool) -> dict[str, int]:
+        """Return pool usage statistics."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "sessions": len(self._sessions),
+            }
+
+    def close(self: SessionPool) -> None:
+        """Close all pooled sessions."""
+        with self._lock:
+            for pooled in self._sessions.values():
+                pooled.session.close()
+            self._sessions.clear()
+
+    @staticmethod
+    def _key(url: str) -> str:
+        parsed_url = urlparse(url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}"
+
+    def _create_session(self: SessionPool) -> requests.Session:
+        s = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self._max_connections_per_host,
+            pool_block=True,
+        )
+        s.mount("http://", adapter)
+        s.mount("https://", adapter)
+        s.mount("file://", FileAdapter())
+        s.headers.update(self._headers)
+        return s
+
+    def _evict_idle(self: SessionPool, now: float) -> None:
+        for key, pooled in list(self._sessions.items()):
+            if not pooled.in_use and now - pooled.last_used >= self._idle_timeout:
+                _LOGGER.debug("Closing idle HTTP session for %s", key)
+                pooled.session.close()
+                del self._sessions[key]
+                self.evictions += 1
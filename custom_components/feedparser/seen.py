@@ -0,0 +1,67 @@
+"""Bounded index of the entries seen by a sensor."""
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+KEY_DIGEST_SIZE = 8
+
+
+class SeenIndex:
+    """Remember when the entries were seen first, forget the least recently seen.
+
+    The entry ids are stored as fixed-size digests, so the memory of the index is
+    bounded by its size whatever the ids of the feed look like. The size should be
+    larger than the number of the entries shown by the sensor, otherwise shown
+    entries are forgotten and seen as new again.
+
+    The times are timestamps in seconds.
+    """
+
+    def __init__(self: SeenIndex, max_size: int) -> None:
+        """Initialize the empty index."""
+        self.max_size = max_size
+        # first seen times by the digests of the entry ids, least recently seen first
+        self._first_seen: OrderedDict[str, float] = OrderedDict()
+        # incremented when an entry is added, tells whether to store the index
+        self.version = 0
+
+    def __repr__(self: SeenIndex) -> str:
+        """Return the representation."""
+        return f"SeenIndex(max_size={self.max_size}, size={len(self)})"
+
+    def __len__(self: SeenIndex) -> int:
+        """Return number of the entries in the index."""
+        return len(self._first_seen)
+
+    def observe(self: SeenIndex, entry_id: str, now: float) -> tuple[bool, float]:
+        """Record the entry seen at the given time.
+
+        Return whether the entry is new and the time it was seen first.
+        """
+        key = hashlib.blake2b(
+            entry_id.encode(),
+            digest_size=KEY_DIGEST_SIZE,
+        ).hexdigest()
+        if (first_seen := self._first_seen.get(key)) is not None:
+            self._first_seen.move_to_end(key)
+            return False, first_seen
+        self._first_seen[key] = now
+        if len(self._first_seen) > self.max_size:
+            self._first_seen.popitem(last=False)
+        self.version += 1
+        return True, now
+
+    def items(self: SeenIndex) -> list[tuple[str, float]]:
+        """Return the digests and the first seen times to be stored."""
+        return list(self._first_seen.items())
+
+    def restore(self: SeenIndex, items: Iterable[tuple[str, float]]) -> None:
+        """Restore the stored digests and first seen times."""
+        self._first_seen = OrderedDict(items)
+        while len(self._first_seen) > self.max_size:
+            self._first_seen.popitem(last=False)
@@ -1,30 +1,66 @@
 """Feedparser sensor."""
 from __future__ import annotations
 
+import asyncio
 import email.utils
+import hashlib
+import heapq
 import logging
+import math
 import re
-from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING
+from concurrent.futures.process import BrokenProcessPool
+from datetime import UTC, datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import islice
+from typing import TYPE_CHECKING, Any, NamedTuple, TypeVar
 
-import feedparser  # type: ignore[import]
 import homeassistant.helpers.config_validation as cv
-import requests
 import voluptuous as vol
 from dateutil import parser
 from feedparser import FeedParserDict
 from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
-from homeassistant.const import CONF_NAME, CONF_SCAN_INTERVAL
-from homeassistant.util import dt
-from requests_file import FileAdapter
+from homeassistant.const import (
+    CONF_NAME,
+    CONF_SCAN_INTERVAL,
+    EVENT_HOMEASSISTANT_STOP,
+)
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.json import json_bytes
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt, slugify
+
+from .adaptive import AdaptiveInterval, feed_update_period
+from .breaker import DEFAULT_COOLDOWN, CircuitBreaker
+from .coordinator import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    FeedCoordinator,
+    FeedData,
+    FetchOptions,
+    parse_feed,
+)
+from .entries import CompactEntry, compact_entry
+from .filters import FILTER_FIELDS, EntryFilter
+from .metrics import UpdateMetrics, publish_metrics
+from .pool import SessionPool
+from .seen import SeenIndex
+from .worker import ProcessPool
 
 if TYPE_CHECKING:
-    from homeassistant.core import HomeAssistant
-    from homeassistant.helpers.entity_platform import AddEntitiesCallback
+    import time
+    from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+
+    from homeassistant.core import Event, HomeAssistant
+    from homeassistant.helpers.entity_platform import (
+        AddEntitiesCallback,
+        EntityPlatform,
+    )
     from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
 __version__ = "0.1.11"
 
+DOMAIN = "feedparser"
 COMPONENT_REPO = "https://github.com/custom-components/feedparser/"
 
 REQUIREMENTS = ["feedparser"]
@@ -36,18 +72,100 @@ CONF_INCLUSIONS = "inclusions"
 CONF_EXCLUSIONS = "exclusions"
 CONF_SHOW_TOPN = "show_topn"
 CONF_REMOVE_SUMMARY_IMG = "remove_summary_image"
+CONF_ASYNC_FETCH = "async_fetch"
+CONF_STREAMING_PARSE = "streaming_parse"
+CONF_MAX_FEED_SIZE = "max_feed_size"
+CONF_SUMMARY_MAX_LENGTH = "summary_max_length"
+CONF_PROCESS_POOL_THRESHOLD = "process_pool_threshold"
+CONF_DIAGNOSTICS = "diagnostics"
+CONF_ENTRIES_MAX_SIZE = "entries_max_size"
+CONF_RECORD_ENTRIES = "record_entries"
+CONF_PERSIST_ENTRIES = "persist_entries"
+CONF_STAGGERED_POLLING = "staggered_polling"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_MIN_SCAN_INTERVAL = "min_scan_interval"
+CONF_MAX_SCAN_INTERVAL = "max_scan_interval"
+CONF_CONNECT_TIMEOUT = "connect_timeout"
+CONF_READ_TIMEOUT = "read_timeout"
+CONF_BREAKER_COOLDOWN = "breaker_cooldown"
+CONF_NEW_ENTRY_EVENTS = "new_entry_events"
+CONF_SEEN_INDEX_SIZE = "seen_index_size"
+CONF_ENTRY_INCLUSIONS = "entry_inclusions"
+CONF_ENTRY_EXCLUSIONS = "entry_exclusions"
+
+ATTR_ENTRIES = "entries"
+ATTR_CIRCUIT_BREAKER = "circuit_breaker"
+ATTR_IS_NEW = "is_new"
+ATTR_FIRST_SEEN = "first_seen"
+# flags of a seen entry with the longest JSON, the entries are fitted with them
+LONGEST_SEEN_FLAGS = {
+    ATTR_IS_NEW: False,
+    ATTR_FIRST_SEEN: datetime.max.replace(tzinfo=UTC),
+}
+
+EVENT_NEW_ENTRY = f"{DOMAIN}_new_entry"
+# keys of the sensor entry passed in the new entry event
+EVENT_ENTRY_KEYS = ("title", "link", "published")
 
 DEFAULT_DATE_FORMAT = "%a, %b %d %I:%M %p"
 DEFAULT_SCAN_INTERVAL = timedelta(hours=1)
+DEFAULT_MIN_SCAN_INTERVAL = timedelta(minutes=5)
+DEFAULT_MAX_SCAN_INTERVAL = timedelta(days=1)
+DEFAULT_BREAKER_COOLDOWN = timedelta(seconds=DEFAULT_COOLDOWN)
 DEFAULT_THUMBNAIL = "https://www.home-assistant.io/images/favicon-192x192-full.png"
 DEFAULT_TOPN = 9999
+DEFAULT_MAX_FEED_SIZE = 10 * 1024 * 1024
+ENTRY_CACHE_SIZE = 500
+SNAPSHOT_VERSION = 1
+SEEN_INDEX_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 30
+# staggered sensors spread their first polls over this number of seconds
+FIRST_POLL_WINDOW = 60
+# and move each following poll by up to this fraction of the scan interval
+POLL_JITTER = 0.05
+MAX_CONCURRENT_UPDATES = 4
+DATA_UPDATE_SEMAPHORE = f"{DOMAIN}_update_semaphore"
+DATA_STOP_LISTENER = f"{DOMAIN}_stop_listener"
 USER_AGENT = f"Home Assistant Feed-parser Integration {__version__}"
+REQUEST_HEADERS = {"User-Agent": USER_AGENT, "Accept-Encoding": "gzip, deflate"}
 IMAGE_REGEX = r"<img.+?src=\"(.+?)\".+?>"
+IMAGE_PATTERN = re.compile(IMAGE_REGEX)
+SUMMARY_ELLIPSIS = "…"
+DATE_KEYS = frozenset({"published", "updated", "created", "expired"})
+# UTC offset at the end of a date-time string with a whole number of seconds
+DATE_TIME_OFFSET_REGEX = re.compile(
+    r"\d:\d{2}(?::\d{2})?\s*"
+    r"(?:(?P<sign>[+-])(?P<hours>\d{2}):?(?P<minutes>\d{2})|GMT|UTC?|Z)$",
+)
+
+# HTTP sessions are shared by all sensors to reuse connections to the same host
+SESSION_POOL = SessionPool(headers=REQUEST_HEADERS)
+# large feeds are parsed in worker processes not to hold the GIL of Home Assistant
+PROCESS_POOL = ProcessPool()
+
+
+def _valid_pattern(value: Any) -> str:  # noqa: ANN401
+    """Validate regular expression of the entry filter rule."""
+    pattern = cv.string(value)
+    cv.is_regex(pattern)
+    return pattern
+
+
+FILTER_RULE_SCHEMA = vol.Any(
+    _valid_pattern,
+    {
+        vol.Required("pattern"): _valid_pattern,
+        vol.Optional("fields"): vol.All(cv.ensure_list, [vol.In(FILTER_FIELDS)]),
+    },
+)
 
 PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
     {
         vol.Required(CONF_NAME): cv.string,
-        vol.Required(CONF_FEED_URL): cv.string,
+        vol.Required(CONF_FEED_URL): vol.Any(
+            vol.All(list, vol.Length(min=1), [cv.string]),
+            cv.string,
+        ),
         vol.Required(CONF_DATE_FORMAT, default=DEFAULT_DATE_FORMAT): cv.string,
         vol.Optional(CONF_LOCAL_TIME, default=False): cv.boolean,
         vol.Optional(CONF_SHOW_TOPN, default=DEFAULT_TOPN): cv.positive_int,
@@ -55,69 +173,279 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend(
         vol.Optional(CONF_INCLUSIONS, default=[]): vol.All(cv.ensure_list, [cv.string]),
         vol.Optional(CONF_EXCLUSIONS, default=[]): vol.All(cv.ensure_list, [cv.string]),
         vol.Optional(CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL): cv.time_period,
+        vol.Optional(CONF_ASYNC_FETCH, default=False): cv.boolean,
+        vol.Optional(CONF_STREAMING_PARSE, default=False): cv.boolean,
+        vol.Optional(
+            CONF_MAX_FEED_SIZE,
+            default=DEFAULT_MAX_FEED_SIZE,
+        ): cv.positive_int,
+        vol.Optional(CONF_SUMMARY_MAX_LENGTH): cv.positive_int,
+        vol.Optional(CONF_PROCESS_POOL_THRESHOLD): cv.positive_int,
+        vol.Optional(CONF_DIAGNOSTICS, default=False): cv.boolean,
+        vol.Optional(CONF_ENTRIES_MAX_SIZE): cv.positive_int,
+        vol.Optional(CONF_RECORD_ENTRIES, default=True): cv.boolean,
+        vol.Optional(CONF_PERSIST_ENTRIES, default=False): cv.boolean,
+        vol.Optional(CONF_STAGGERED_POLLING, default=False): cv.boolean,
+        vol.Optional(CONF_ADAPTIVE_POLLING, default=False): cv.boolean,
+        vol.Optional(
+            CONF_MIN_SCAN_INTERVAL,
+            default=DEFAULT_MIN_SCAN_INTERVAL,
+        ): cv.time_period,
+        vol.Optional(
+            CONF_MAX_SCAN_INTERVAL,
+            default=DEFAULT_MAX_SCAN_INTERVAL,
+        ): cv.time_period,
+        vol.Optional(
+            CONF_CONNECT_TIMEOUT,
+            default=DEFAULT_CONNECT_TIMEOUT,
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_READ_TIMEOUT,
+            default=DEFAULT_READ_TIMEOUT,
+        ): cv.positive_float,
+        vol.Optional(
+            CONF_BREAKER_COOLDOWN,
+            default=DEFAULT_BREAKER_COOLDOWN,
+        ): cv.time_period,
+        vol.Optional(CONF_NEW_ENTRY_EVENTS, default=False): cv.boolean,
+        vol.Optional(CONF_SEEN_INDEX_SIZE): cv.positive_int,
+        vol.Optional(CONF_ENTRY_INCLUSIONS, default=[]): vol.All(
+            cv.ensure_list,
+            [FILTER_RULE_SCHEMA],
+        ),
+        vol.Optional(CONF_ENTRY_EXCLUSIONS, default=[]): vol.All(
+            cv.ensure_list,
+            [FILTER_RULE_SCHEMA],
+        ),
     },
 )
 
+
+def _validate_feed_urls(config: ConfigType) -> ConfigType:
+    """Reject the options not supported by sensors merging several feeds."""
+    feeds = config[CONF_FEED_URL]
+    if isinstance(feeds, list) and len(feeds) > 1:
+        for option in (CONF_PERSIST_ENTRIES, CONF_ADAPTIVE_POLLING):
+            if config[option]:
+                msg = f"{option} is not supported with multiple feed URLs"
+                raise vol.Invalid(msg, path=[option])
+    return config
+
+
+# sensors merging several feeds do not support all the options
+PLATFORM_SCHEMA = vol.All(PLATFORM_SCHEMA, _validate_feed_urls)
+
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
+
+class AttributeSettings(NamedTuple):
+    """Settings of the sensor affecting its entries and state attributes."""
+
+    date_format: str = DEFAULT_DATE_FORMAT
+    show_topn: int = DEFAULT_TOPN
+    remove_summary_image: bool = False
+    inclusions: Sequence[str] = ()
+    exclusions: Sequence[str] = ()
+    local_time: bool = False
+    summary_max_length: int | None = None
+    entries_max_size: int | None = None
+    entry_inclusions: Sequence[str | dict[str, Any]] = ()
+    entry_exclusions: Sequence[str | dict[str, Any]] = ()
+    record_entries: bool = True
+    diagnostics: bool = False
+
+
+class PollingSettings(NamedTuple):
+    """Settings of the sensor affecting when it updates and what it keeps."""
+
+    scan_interval: timedelta = DEFAULT_SCAN_INTERVAL
+    staggered_polling: bool = False
+    adaptive_polling: bool = False
+    min_scan_interval: timedelta = DEFAULT_MIN_SCAN_INTERVAL
+    max_scan_interval: timedelta = DEFAULT_MAX_SCAN_INTERVAL
+    new_entry_events: bool = False
+    seen_index_size: int | None = None
+    persist_entries: bool = False
+
+
+class FetchSettings(NamedTuple):
+    """Settings of the sensor affecting how its feed is fetched and parsed."""
+
+    streaming_parse: bool = False
+    max_feed_size: int = DEFAULT_MAX_FEED_SIZE
+    process_pool_threshold: int | None = None
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT
+    read_timeout: float = DEFAULT_READ_TIMEOUT
+    breaker_cooldown: timedelta = DEFAULT_BREAKER_COOLDOWN
+
+
+_SettingsT = TypeVar("_SettingsT", AttributeSettings, PollingSettings, FetchSettings)
+
+
+def _settings(settings_cls: type[_SettingsT], config: Mapping[str, Any]) -> _SettingsT:
+    """Return settings of the sensor taken from its configuration.
+
+    The fields of the settings are named after the configuration options, options
+    missing in the configuration keep their defaults.
+    """
+    return settings_cls(
+        **{key: config[key] for key in settings_cls._fields if key in config},
+    )
+
+
+def _settings_from_config(config: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the settings passed to the sensor constructor from its configuration."""
+    return {
+        "attributes": _settings(AttributeSettings, config),
+        "polling": _settings(PollingSettings, config),
+        "fetching": _settings(FetchSettings, config),
+    }
+
+
+class _Projection(NamedTuple):
+    """Plan projecting feed entries into sensor entries.
+
+    `fields` pairs the included keys with their transformers (None keeps the value
+    as is). If there are no inclusions, `all_fields` is set and all the keys which
+    are not excluded are projected using `transformers`.
+    """
+
+    fields: tuple[tuple[str, Callable[[FeedParserDict, str, Any], Any] | None], ...]
+    all_fields: bool
+    excluded: frozenset[str]
+    transformers: dict[str, Callable[[FeedParserDict, str, Any], Any]]
+    image: bool
+    link: bool
+
 
 async def async_setup_platform(
-    hass: HomeAssistant,  # noqa: ARG001
+    hass: HomeAssistant,
     config: ConfigType,
     async_add_devices: AddEntitiesCallback,
     discovery_info: DiscoveryInfoType | None = None,  # noqa: ARG001
 ) -> None:
     """Set up the Feedparser sensor."""
+    # the pools shared by all the sensors are closed once, when Home Assistant stops
+    if DATA_STOP_LISTENER not in hass.data:
+        hass.data[DATA_STOP_LISTENER] = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP,
+            _close_pools,
+        )
+    feeds = config[CONF_FEED_URL]
+    if isinstance(feeds, list) and len(feeds) > 1:
+        sensor_cls: type[FeedParserSensor] = AggregateFeedParserSensor
+    elif config[CONF_ASYNC_FETCH]:
+        sensor_cls = AsyncFeedParserSensor
+    else:
+        sensor_cls = FeedParserSensor
     async_add_devices(
-        [
-            FeedParserSensor(
-                feed=config[CONF_FEED_URL],
-                name=config[CONF_NAME],
-                date_format=config[CONF_DATE_FORMAT],
-                show_topn=config[CONF_SHOW_TOPN],
-                remove_summary_image=config[CONF_REMOVE_SUMMARY_IMG],
-                inclusions=config[CONF_INCLUSIONS],
-                exclusions=config[CONF_EXCLUSIONS],
-                scan_interval=config[CONF_SCAN_INTERVAL],
-                local_time=config[CONF_LOCAL_TIME],
-            ),
-        ],
-        update_before_add=True,
+        [sensor_cls.from_config(config)],
+        # sensors restoring the snapshot of the feed or the seen entries do not wait
+        # for the feed, staggered sensors schedule their first update themselves
+        update_before_add=not (
+            config[CONF_PERSIST_ENTRIES]
+            or config[CONF_STAGGERED_POLLING]
+            or config.get(CONF_SEEN_INDEX_SIZE)
+        ),
     )
 
 
+def _close_pools(_: Event) -> None:
+    """Stop the worker processes and close the pooled HTTP sessions."""
+    PROCESS_POOL.close()
+    SESSION_POOL.close()
+
+
 class FeedParserSensor(SensorEntity):
     """Representation of a Feedparser sensor."""
 
     # force update the entity since the number of feed entries does not necessarily
-    # change, but we still want to update the extra_state_attributes
+    # change, but we still want to update the extra_state_attributes, sensors firing
+    # the new entry events write their state only when the entries change
     _attr_force_update = True
+    # the timings differ in each update, do not store them in the recorder
+    _unrecorded_attributes = frozenset({CONF_DIAGNOSTICS})
 
     def __init__(
         self: FeedParserSensor,
         feed: str,
         name: str,
-        date_format: str,
-        show_topn: int,
-        remove_summary_image: bool,
-        exclusions: list[str | None],
-        inclusions: list[str | None],
-        scan_interval: timedelta,
-        local_time: bool,
+        attributes: AttributeSettings | None = None,
+        polling: PollingSettings | None = None,
+        fetching: FetchSettings | None = None,
     ) -> None:
         """Initialize the Feedparser sensor."""
+        attributes = attributes or AttributeSettings()
+        polling = polling or PollingSettings()
+        self._attribute_settings = attributes
+        self._polling_settings = polling
+        self._fetch_settings = fetching or FetchSettings()
         self._feed = feed
         self._attr_name = name
         self._attr_icon = "mdi:rss"
-        self._date_format = date_format
-        self._show_topn: int = show_topn
-        self._remove_summary_image = remove_summary_image
-        self._inclusions = inclusions
-        self._exclusions = exclusions
-        self._scan_interval = scan_interval
-        self._local_time = local_time
-        self._entries: list[dict[str, str]] = []
-        self._attr_extra_state_attributes = {"entries": self._entries}
+        self._date_format = attributes.date_format
+        self._show_topn: int = attributes.show_topn
+        self._remove_summary_image = attributes.remove_summary_image
+        self._inclusions = attributes.inclusions
+        self._exclusions = attributes.exclusions
+        self._projection = self._compile_projection()
+        self._entry_filter = EntryFilter(
+            include=attributes.entry_inclusions,
+            exclude=attributes.entry_exclusions,
+        )
+        self._scan_interval = polling.scan_interval
+        self._local_time = attributes.local_time
+        self._adaptive = (
+            AdaptiveInterval(
+                scan_interval=self._fetch_options().scan_interval.total_seconds(),
+                min_interval=polling.min_scan_interval.total_seconds(),
+                max_interval=polling.max_scan_interval.total_seconds(),
+            )
+            if polling.adaptive_polling
+            else None
+        )
+        self._new_entry_events = polling.new_entry_events
+        self._attr_force_update = not polling.new_entry_events
+        self._entry_ids: frozenset[str] = frozenset()
+        # ids of the feed entries the sensor entries were generated from
+        self._shown_entry_ids: tuple[str | None, ...] = ()
+        self._new_entries: list[dict[str, Any]] = []
+        self._seen = (
+            SeenIndex(polling.seen_index_size) if polling.seen_index_size else None
+        )
+        # whether the shown entries are new and when they were seen first
+        self._seen_flags: list[tuple[bool, float] | None] = []
+        self._seen_store: Store | None = None
+        self._saved_seen_version = 0
+        self._update_period: float | None = None
+        # staggered and adaptive sensors schedule their polls themselves
+        self._attr_should_poll = not (
+            polling.staggered_polling or polling.adaptive_polling
+        )
+        self._unsub_poll: CALLBACK_TYPE | None = None
+        self._poll_task: asyncio.Task | None = None
+        self._store: Store | None = None
+        self._saved_snapshot: tuple[bytes | None, tuple[str | None, str | None]] = (
+            None,
+            (None, None),
+        )
+        self._update_metrics: UpdateMetrics | None = None
+        self._summary_processor = SummaryProcessor(
+            remove_images=attributes.remove_summary_image,
+            max_length=attributes.summary_max_length,
+        )
+        self._coordinator: FeedCoordinator | None = None
+        self._fingerprint: bytes | None = None
+        self._full_parse_count = 0
+        self._skipped_parse_count = 0
+        self._entry_cache: dict[tuple[str, str | None], CompactEntry] = {}
+        self._entries: list[CompactEntry] = []
+        # the attributes are rebuilt only when they change, see _set_entries
+        self._entries_attribute: list[dict[str, Any]] | None = None
+        self._attributes: dict[str, Any] | None = None
+        self._attributes_key: tuple | None = None
         self._attr_attribution = "Data retrieved using RSS feedparser"
         _LOGGER.debug("Feed %s: FeedParserSensor initialized - %s", self.name, self)
 
@@ -125,97 +453,851 @@ class FeedParserSensor(SensorEntity):
         """Return the representation."""
         return (
             f'FeedParserSensor(name="{self.name}", feed="{self._feed}", '
-            f"show_topn={self._show_topn}, "
-            f"remove_summary_image={self._remove_summary_image}, "
-            f"inclusions={self._inclusions}, "
-            f"exclusions={self._exclusions}, scan_interval={self._scan_interval}, "
-            f'local_time={self._local_time}, date_format="{self._date_format}")'
+            f"attributes={self._current_attribute_settings()}, "
+            f"polling={self._polling_settings}, fetching={self._fetch_settings})"
+        )
+
+    @classmethod
+    def from_config(
+        cls: type[FeedParserSensor],
+        config: Mapping[str, Any],
+    ) -> FeedParserSensor:
+        """Create the sensor from the validated configuration of the platform."""
+        feed = config[CONF_FEED_URL]
+        return cls(
+            feed[0] if isinstance(feed, list) else feed,
+            config[CONF_NAME],
+            **_settings_from_config(config),
         )
 
     def update(self: FeedParserSensor) -> None:
         """Parse the feed and update the state of the sensor."""
         _LOGGER.debug("Feed %s: Polling feed data from %s", self.name, self._feed)
-        s: requests.Session = requests.Session()
-        s.mount("file://", FileAdapter())
-        s.headers.update({"User-Agent": USER_AGENT})
-        res: requests.Response = s.get(self._feed)
-        res.raise_for_status()
-        parsed_feed: FeedParserDict = feedparser.parse(res.text)
+        metrics = UpdateMetrics()
+        with metrics.timed("total"):
+            self._process_data(self._get_coordinator().fetch(self, metrics), metrics)
+        self._publish_metrics(metrics)
+        self._schedule_snapshot_save()
+        self._schedule_seen_save()
+
+    def _get_coordinator(self: FeedParserSensor) -> FeedCoordinator:
+        """Return coordinator fetching the feed, share it among sensors of the feed."""
+        if self._coordinator is None:
+            self._coordinator = self._register_coordinator(self._feed)
+        return self._coordinator
+
+    def _register_coordinator(self: FeedParserSensor, feed: str) -> FeedCoordinator:
+        """Return coordinator of the feed shared by its sensors, register the sensor."""
+        if self.hass is None:
+            coordinator = FeedCoordinator(feed, SESSION_POOL, REQUEST_HEADERS)
+        else:
+            coordinators: dict[str, FeedCoordinator] = self.hass.data.setdefault(
+                DOMAIN,
+                {},
+            )
+            coordinator = coordinators.setdefault(
+                feed,
+                FeedCoordinator(feed, SESSION_POOL, REQUEST_HEADERS),
+            )
+        coordinator.register(self, self._fetch_options())
+        return coordinator
+
+    def _fetch_options(self: FeedParserSensor) -> FetchOptions:
+        """Return options of the sensor affecting how the feed is fetched."""
+        scan_interval = self._scan_interval
+        if not isinstance(scan_interval, timedelta):
+            scan_interval = timedelta(seconds=scan_interval)
+        return FetchOptions(
+            scan_interval=scan_interval,
+            # stop reading the feed once all the displayed entries were received,
+            # filtered entries are not known to be displayed before they are parsed
+            max_entries=(
+                self._show_topn
+                if self._fetch_settings.streaming_parse and not self._entry_filter
+                else None
+            ),
+            max_size=self._fetch_settings.max_feed_size,
+            process_pool_threshold=self._fetch_settings.process_pool_threshold,
+            connect_timeout=self._fetch_settings.connect_timeout,
+            read_timeout=self._fetch_settings.read_timeout,
+            breaker_cooldown=self._fetch_settings.breaker_cooldown.total_seconds(),
+        )
+
+    def add_to_platform_start(
+        self: FeedParserSensor,
+        hass: HomeAssistant,
+        platform: EntityPlatform,
+        parallel_updates: asyncio.Semaphore | None,
+    ) -> None:
+        """Register the sensor with the coordinator of its feed when it is added.
+
+        The coordinator keeps the fetched feed until all its sensors got it, the
+        sensors added together register before the first of them fetches the feed.
+        """
+        super().add_to_platform_start(hass, platform, parallel_updates)
+        self._register_feeds()
+
+    def _register_feeds(self: FeedParserSensor) -> None:
+        """Register the sensor with the coordinator of its feed."""
+        self._get_coordinator()
+
+    async def async_internal_added_to_hass(self: FeedParserSensor) -> None:
+        """Exclude the entries from the recorder if they should not be recorded."""
+        await super().async_internal_added_to_hass()
+        if not self._attribute_settings.record_entries:
+            # the unrecorded attributes are defined per class, extend them for the
+            # sensor in the state info passed to the recorder
+            self._state_info = {
+                "unrecorded_attributes": (
+                    self._state_info["unrecorded_attributes"] | {ATTR_ENTRIES}
+                ),
+            }
+
+    async def async_added_to_hass(self: FeedParserSensor) -> None:
+        """Restore the stored state and fetch the feed in the background."""
+        if self._polling_settings.persist_entries:
+            await self.async_restore_snapshot()
+        if self._seen is not None:
+            await self.async_restore_seen_entries()
+        if self._polling_settings.staggered_polling:
+            # the updates of all the staggered sensors share the concurrency limit
+            self.parallel_updates = self.hass.data.setdefault(
+                DATA_UPDATE_SEMAPHORE,
+                asyncio.Semaphore(MAX_CONCURRENT_UPDATES),
+            )
+        if not self.should_poll:
+            # poll now unless the sensor was updated before it was added
+            self._schedule_poll(first=self._update_metrics is None)
+            self.async_on_remove(self._cancel_poll)
+        elif self._polling_settings.persist_entries or self._seen is not None:
+            # the sensor was added without waiting for the feed, fetch it now
+            self.async_schedule_update_ha_state(force_refresh=True)
+
+    def _next_poll_time(self: FeedParserSensor, now: float, *, first: bool) -> float:
+        """Return timestamp of the next poll of the staggered sensor.
+
+        The first poll is spread over FIRST_POLL_WINDOW. The following polls keep
+        the phase of the sensor within the scan interval, every poll is moved by
+        a jitter of up to POLL_JITTER of the interval. Both the phase and the jitter
+        are derived from the feed and the name, so they do not change on restarts.
+        """
+        interval = self._fetch_options().scan_interval.total_seconds()
+        if first:
+            return now + self._jitter("first") * min(interval, FIRST_POLL_WINDOW)
+        if self._adaptive:
+            jitter = (self._jitter(now) * 2 - 1) * POLL_JITTER
+            return now + self._adaptive.interval * (1 + jitter)
+        phase = self._jitter("phase") * interval
+        poll = math.floor((now - phase) / interval)
+        while True:
+            poll += 1
+            jitter = (self._jitter(poll) * 2 - 1) * POLL_JITTER * interval
+            if (poll_time := phase + poll * interval + jitter) > now:
+                return poll_time
+
+    def _jitter(self: FeedParserSensor, key: object) -> float:
+        """Return number from [0, 1) derived from the feed, the name and the key."""
+        digest = hashlib.blake2b(
+            f"{self._feed}|{self.name}|{key}".encode(),
+            digest_size=8,
+        ).digest()
+        return int.from_bytes(digest) / 2**64
+
+    @callback
+    def _schedule_poll(self: FeedParserSensor, *, first: bool = False) -> None:
+        """Schedule the next poll of the staggered sensor."""
+        poll_time = self._next_poll_time(dt.utcnow().timestamp(), first=first)
+        self._cancel_poll()
+        self._unsub_poll = async_track_point_in_utc_time(
+            self.hass,
+            self._async_poll,
+            dt.utc_from_timestamp(poll_time),
+        )
+
+    @callback
+    def _async_poll(self: FeedParserSensor, now: datetime) -> None:  # noqa: ARG002
+        """Update the sensor and schedule its next poll."""
+        self._unsub_poll = None
+        self._poll_task = self.hass.async_create_task(self._async_poll_update())
 
+    async def _async_poll_update(self: FeedParserSensor) -> None:
+        try:
+            await self.async_update_ha_state(force_refresh=True)
+        finally:
+            # the adaptive interval depends on the result of the update
+            self._poll_task = None
+            self._schedule_poll()
+
+    async def async_update_ha_state(
+        self: FeedParserSensor,
+        force_refresh: bool = False,  # noqa: FBT002
+    ) -> None:
+        """Update the state, fire the new entry events if the sensor was updated.
+
+        The sensor is refreshed this way also when another sensor of the feed
+        fetched a changed feed.
+        """
+        if force_refresh and self._new_entry_events:
+            await self._async_update_entries()
+        else:
+            await super().async_update_ha_state(force_refresh)
+
+    async def _async_update_entries(self: FeedParserSensor) -> None:
+        """Update the sensor and fire an event for each new entry.
+
+        The state is written only if the entries or the circuit breaker changed.
+        """
+        state = self._state_signature()
+        await self.async_device_update()
+        if self._state_signature() != state:
+            self.async_write_ha_state()
+        new_entries, self._new_entries = self._new_entries, []
+        for event_data in new_entries:
+            self.hass.bus.async_fire(EVENT_NEW_ENTRY, event_data)
+
+    def _state_signature(self: FeedParserSensor) -> tuple:
+        """Return value which changes whenever the state of the sensor changes."""
+        return (
+            self.native_value,
+            # the unchanged entries are the same objects, comparing them is cheap
+            tuple(self._entries),
+            tuple(
+                (breaker.state, breaker.failures)
+                for breaker in self.circuit_breakers.values()
+            ),
+        )
+
+    @callback
+    def _cancel_poll(self: FeedParserSensor) -> None:
+        if self._unsub_poll:
+            self._unsub_poll()
+            self._unsub_poll = None
+        if self._poll_task:
+            self._poll_task.cancel()
+            self._poll_task = None
+
+    async def async_restore_snapshot(self: FeedParserSensor) -> bool:
+        """Restore the entries and the validators of the feed stored on disk.
+
+        Return whether the snapshot was restored. Snapshots made with a different
+        configuration of the sensor are not restored.
+        """
+        self._store = Store(self.hass, SNAPSHOT_VERSION, self._snapshot_key())
+        snapshot = await self._store.async_load()
+        if not snapshot or snapshot["config"] != self._snapshot_config():
+            return False
+        self._attr_native_value = snapshot["native_value"]
+        strings: dict[str, str] = {}
+        self._set_entries([compact_entry(e, strings) for e in snapshot["entries"]])
+        self._fingerprint = bytes.fromhex(snapshot["fingerprint"])
+        self._entry_ids = frozenset(snapshot.get("entry_ids", ()))
+        self._shown_entry_ids = tuple(snapshot.get("shown_entry_ids", ()))
+        validators = (snapshot["etag"], snapshot["last_modified"])
+        self._get_coordinator().restore_validators(self, *validators)
+        self._saved_snapshot = (self._fingerprint, validators)
+        _LOGGER.debug(
+            "Feed %s: Restored %s entries from the snapshot",
+            self.name,
+            len(self._entries),
+        )
+        return True
+
+    def _snapshot_key(self: FeedParserSensor) -> str:
+        """Return key of the store keeping the snapshot of the sensor."""
+        feed_hash = hashlib.blake2b(self._feed.encode(), digest_size=4).hexdigest()
+        return f"{DOMAIN}.{slugify(self.name)}_{feed_hash}"
+
+    def _snapshot_config(self: FeedParserSensor) -> str:
+        """Return digest of the configuration the entries were generated with."""
+        config = self._worker_config() | {"time_zone": str(dt.DEFAULT_TIME_ZONE)}
+        return hashlib.blake2b(
+            repr(sorted(config.items())).encode(),
+            digest_size=16,
+        ).hexdigest()
+
+    def _schedule_snapshot_save(self: FeedParserSensor) -> None:
+        """Save the snapshot of the feed unless it did not change."""
+        if self._store is None or self._fingerprint is None:
+            return
+        snapshot = (self._fingerprint, self._get_coordinator().validators)
+        if snapshot == self._saved_snapshot:
+            return
+        self._saved_snapshot = snapshot
+        # the update runs in an executor thread, save from the event loop
+        self.hass.add_job(
+            self._store.async_delay_save,
+            self._snapshot,
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    def _snapshot(self: FeedParserSensor) -> dict[str, Any]:
+        """Return snapshot of the processed feed to be stored."""
+        fingerprint, (etag, last_modified) = self._saved_snapshot
+        return {
+            "config": self._snapshot_config(),
+            "native_value": self.native_value,
+            "entries": [e.as_dict() for e in self._entries],
+            "fingerprint": fingerprint.hex(),  # type: ignore[union-attr]
+            "entry_ids": sorted(self._entry_ids),
+            "shown_entry_ids": list(self._shown_entry_ids),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+
+    async def async_restore_seen_entries(self: FeedParserSensor) -> None:
+        """Restore the index of the seen entries stored on disk."""
+        self._seen_store = Store(
+            self.hass,
+            SEEN_INDEX_VERSION,
+            f"{self._snapshot_key()}_seen",
+        )
+        if stored := await self._seen_store.async_load():
+            self._seen.restore(stored["entries"])  # type: ignore[union-attr]
+        self._saved_seen_version = self._seen.version  # type: ignore[union-attr]
+
+    def _schedule_seen_save(self: FeedParserSensor) -> None:
+        """Save the index of the seen entries unless no entry was added."""
+        if (
+            self._seen_store is None
+            or self._seen is None
+            or self._seen.version == self._saved_seen_version
+        ):
+            return
+        self._saved_seen_version = self._seen.version
+        self.hass.add_job(
+            self._seen_store.async_delay_save,
+            lambda: {"entries": self._seen.items()},  # type: ignore[union-attr]
+            SNAPSHOT_SAVE_DELAY,
+        )
+
+    async def async_will_remove_from_hass(self: FeedParserSensor) -> None:
+        """Stop sharing the feed with the other sensors."""
+        if self._coordinator is None:
+            return
+        self._unregister_coordinator(self._coordinator)
+        self._coordinator = None
+
+    def _unregister_coordinator(
+        self: FeedParserSensor,
+        coordinator: FeedCoordinator,
+    ) -> None:
+        """Unregister the sensor, drop the coordinator no other sensor uses."""
+        coordinator.unregister(self)
+        coordinators: dict[str, FeedCoordinator] = self.hass.data.get(DOMAIN, {})
+        if (
+            not coordinator.has_sensors
+            and coordinators.get(coordinator.url) is coordinator
+        ):
+            del coordinators[coordinator.url]
+
+    def _process_data(
+        self: FeedParserSensor,
+        data: FeedData | None,
+        metrics: UpdateMetrics,
+    ) -> None:
+        """Process the fetched feed unless it was already processed."""
+        if data is None:
+            if metrics.not_modified:
+                self._skipped_parse_count += 1
+            self._observe_poll(0)
+            self._update_seen(changed=False)
+            return
+        if data.fingerprint == self._fingerprint:
+            _LOGGER.debug("Feed %s: Feed content did not change", self.name)
+            self._skipped_parse_count += 1
+            self._observe_poll(0)
+            self._update_seen(changed=False)
+            return
+        entry_ids = self._entry_ids
+        # the feed processed in a worker process is parsed there
+        parsed_feed = (
+            None
+            if self._fetch_options().offloads(data.size)
+            else self._parse(data, metrics)
+        )
+        if parsed_feed is None and not self._process_feed_in_worker(data, metrics):
+            parsed_feed = self._parse(data, metrics)
+        if parsed_feed is not None:
+            with metrics.timed("generate"):
+                self._process_feed(parsed_feed)
+        self._fingerprint = data.fingerprint
+        self._full_parse_count += 1
+        self._observe_poll(len(self._entry_ids - entry_ids))
+        self._update_seen(changed=True)
+        # the entries found by the first poll are not new, they are the baseline
+        if self._new_entry_events and entry_ids:
+            self._new_entries = self._new_entry_event_data(entry_ids)
+
+    def _parse(
+        self: FeedParserSensor,
+        data: FeedData,
+        metrics: UpdateMetrics,
+    ) -> FeedParserDict:
+        """Return the parsed feed, parse it unless another sensor already did."""
+        if data.parsed_feed is not None:
+            return data.parsed_feed
+        return self._get_coordinator().parse(data, metrics)
+
+    def _new_entry_event_data(
+        self: FeedParserSensor,
+        previous_entry_ids: frozenset[str],
+    ) -> list[dict[str, Any]]:
+        """Return data of the events of the entries not in the previous poll."""
+        return [
+            {"entity_id": self.entity_id, "id": entry_id}
+            | {
+                key: value
+                for key, value in entry.as_dict().items()
+                if key in EVENT_ENTRY_KEYS
+            }
+            for entry_id, entry in zip(
+                self._shown_entry_ids,
+                self._entries,
+                strict=False,
+            )
+            if entry_id and entry_id not in previous_entry_ids
+        ]
+
+    def _update_seen(self: FeedParserSensor, *, changed: bool) -> None:
+        """Flag the entries the update saw first, look up when the others were seen."""
+        if self._seen is None:
+            return
+        if not changed and len(self._seen_flags) == len(self._entries):
+            # the entries seen first by the previous update are no longer new
+            if any(flags and flags[0] for flags in self._seen_flags):
+                self._seen_flags = [
+                    flags and (False, flags[1]) for flags in self._seen_flags
+                ]
+                self._invalidate_attributes()
+            return
+        now = dt.utcnow().timestamp()
+        self._seen_flags = [
+            self._seen.observe(entry_id, now) if entry_id else None
+            for entry_id in self._shown_entry_ids[: len(self._entries)]
+        ]
+        self._invalidate_attributes()
+
+    def _observe_poll(self: FeedParserSensor, new_entries: int) -> None:
+        """Adapt the scan interval to the number of new entries found by the poll."""
+        if self._adaptive is None:
+            return
+        self._adaptive.update_period = self._update_period
+        self._adaptive.max_age = self._get_coordinator().max_age
+        self._adaptive.observe(dt.utcnow().timestamp(), new_entries)
+        _LOGGER.debug("Feed %s: %s", self.name, self._adaptive)
+
+    def _publish_metrics(self: FeedParserSensor, metrics: UpdateMetrics) -> None:
+        """Keep the metrics of the update and pass them to the metrics listeners."""
+        metrics.entries = len(self._entries)
+        metrics.full_parse_count = self._full_parse_count
+        metrics.skipped_parse_count = self._skipped_parse_count
+        _LOGGER.debug("Feed %s: Update metrics - %s", self.name, metrics)
+        self._update_metrics = metrics
+        publish_metrics(self, metrics)
+
+    def _process_feed_in_worker(
+        self: FeedParserSensor,
+        data: FeedData,
+        metrics: UpdateMetrics,
+    ) -> bool:
+        """Parse the feed and generate the entries in a worker process.
+
+        Return False if the worker process was terminated before it finished.
+        """
+        _LOGGER.debug(
+            "Feed %s: Processing feed of %s bytes in a worker process",
+            self.name,
+            data.size,
+        )
+        try:
+            with metrics.timed("generate"):
+                result: _WorkerResult = PROCESS_POOL.submit(
+                    _process_feed_in_worker,
+                    self._worker_config(),
+                    data.content,
+                    data.content_type,
+                    str(dt.DEFAULT_TIME_ZONE),
+                ).result()
+        except BrokenProcessPool:
+            _LOGGER.warning(
+                "Feed %s: Worker process was terminated, parsing the feed in-process",
+                self.name,
+            )
+            return False
+        self._attr_native_value = result.native_value
+        self._entry_ids = result.entry_ids
+        self._shown_entry_ids = result.shown_entry_ids
+        self._update_period = result.update_period
+        # entries generated in the worker process are not cached
+        self._entry_cache.clear()
+        self._set_entries(result.entries)
+        return True
+
+    def _worker_config(self: FeedParserSensor) -> dict[str, Any]:
+        """Return configuration of an equivalent sensor in a worker process."""
+        return {
+            "feed": self._feed,
+            "name": self.name,
+            "attributes": self._current_attribute_settings(),
+            # the entries are fitted into their size limit with the seen flags
+            "polling": PollingSettings(
+                seen_index_size=self._polling_settings.seen_index_size,
+            ),
+        }
+
+    def _current_attribute_settings(self: FeedParserSensor) -> AttributeSettings:
+        """Return the attribute settings with the local time option as it is set."""
+        return self._attribute_settings._replace(local_time=self._local_time)
+
+    def _process_feed(self: FeedParserSensor, parsed_feed: FeedParserDict) -> None:
+        """Update the state of the sensor from the parsed feed document."""
+        self._entry_ids = frozenset(
+            entry_id
+            for e in parsed_feed.entries
+            if (entry_id := e.get("id") or e.get("link"))
+        )
+        self._update_period = feed_update_period(parsed_feed)
         if not parsed_feed.entries:
             self._attr_native_value = None
             _LOGGER.warning("Feed %s: No data received.", self.name)
             return
 
         _LOGGER.debug("Feed %s: Feed data fetched successfully", self.name)
+        feed_entries = self._filter_entries(parsed_feed.entries)
         # set the sensor value to the amount of entries
         self._attr_native_value = (
             self._show_topn
-            if len(parsed_feed.entries) > self._show_topn
-            else len(parsed_feed.entries)
+            if len(feed_entries) > self._show_topn
+            else len(feed_entries)
         )
         _LOGGER.debug(
             "Feed %s: %s entries is going to be added to the sensor",
             self.name,
             self.native_value,
         )
-        self._entries.clear()  # clear the entries to avoid duplicates
-        self._entries.extend(self._generate_entries(parsed_feed))
+        self._set_entries(
+            self._fit_entries(
+                self._generate_entries(feed_entries[: self._attr_native_value]),
+            ),
+        )
+        if len(self._entries) < self._attr_native_value:
+            self._attr_native_value = len(self._entries)
+        self._shown_entry_ids = tuple(
+            e.get("id") or e.get("link") for e in feed_entries[: len(self._entries)]
+        )
         _LOGGER.debug(
             "Feed %s: Sensor state updated - %s entries",
             self.name,
-            len(self.feed_entries),
+            len(self._entries),
         )
 
-    def _generate_entries(
+    def _filter_entries(
         self: FeedParserSensor,
-        parsed_feed: FeedParserDict,
-    ) -> list[dict[str, str]]:
+        feed_entries: list[FeedParserDict],
+    ) -> list[FeedParserDict]:
+        """Return the entries passing the entry filter, up to `show_topn` of them."""
+        if not self._entry_filter:
+            return feed_entries
+        filtered_entries = list(
+            islice(filter(self._entry_filter.matches, feed_entries), self._show_topn),
+        )
+        _LOGGER.debug(
+            "Feed %s: %s entries passed the entry filter",
+            self.name,
+            len(filtered_entries),
+        )
+        return filtered_entries
+
+    def _set_entries(self: FeedParserSensor, entries: list[CompactEntry]) -> None:
+        """Replace the entries and invalidate the cached attributes."""
+        # the list is replaced, not modified, as the attributes may be read from
+        # the event loop while the sensor is updated in an executor thread
+        self._entries = entries
+        self._invalidate_attributes()
+
+    def _invalidate_attributes(self: FeedParserSensor) -> None:
+        """Rebuild the attributes when they are read next time."""
+        self._entries_attribute = None
+        self._attributes = None
+
+    def _fit_entries(
+        self: FeedParserSensor,
+        entries: list[CompactEntry],
+    ) -> list[CompactEntry]:
+        """Return the entries fitting into the size limit of the entries attribute.
+
+        The flags of the seen entries are added to the attribute later, so they are
+        fitted with the longest flags.
+        """
+        max_size = self._attribute_settings.entries_max_size
+        if not max_size:
+            return entries
+        entry_dicts = [e.as_dict() for e in entries]
+        if self._seen is not None:
+            entry_dicts = [e | LONGEST_SEEN_FLAGS for e in entry_dicts]
+        if len(json_bytes(entry_dicts)) <= max_size:
+            return entries
+        strings: dict[str, str] = {}
         return [
-            self._generate_sensor_entry(feed_entry)
-            for feed_entry in parsed_feed.entries[
-                : self.native_value  # type: ignore[misc]
-            ]
+            compact_entry(
+                {k: v for k, v in e.items() if k not in LONGEST_SEEN_FLAGS},
+                strings,
+            )
+            for e in self._shrink_entries(entry_dicts, max_size)
         ]
 
+    def _shrink_entries(
+        self: FeedParserSensor,
+        entries: list[dict[str, Any]],
+        max_size: int,
+    ) -> list[dict[str, Any]]:
+        """Return the entries shrunk to the given JSON size.
+
+        The summaries are shortened first. If the entries do not fit even without
+        the summaries, the last entries are dropped.
+        """
+        # find the longest summary length the entries fit with, 0 drops the summaries
+        low, high = 1, max(
+            (len(e["summary"]) for e in entries if isinstance(e.get("summary"), str)),
+            default=0,
+        )
+        fitting_entries = None
+        while low <= high:
+            max_length = (low + high) // 2
+            shortened_entries = self._shorten_summaries(entries, max_length)
+            if len(json_bytes(shortened_entries)) <= max_size:
+                fitting_entries = shortened_entries
+                low = max_length + 1
+            else:
+                high = max_length - 1
+        if fitting_entries is not None:
+            _LOGGER.debug(
+                "Feed %s: Summaries shortened to %s characters to fit %s bytes",
+                self.name,
+                high,
+                max_size,
+            )
+            return fitting_entries
+
+        size = 2  # the brackets of the list
+        fitting_entries = []
+        for entry in self._shorten_summaries(entries, 0):
+            size += len(json_bytes(entry)) + (1 if fitting_entries else 0)
+            if size > max_size:
+                break
+            fitting_entries.append(entry)
+        _LOGGER.debug(
+            "Feed %s: Summaries removed and %s entries dropped to fit %s bytes",
+            self.name,
+            len(entries) - len(fitting_entries),
+            max_size,
+        )
+        return fitting_entries
+
+    @staticmethod
+    def _shorten_summaries(
+        entries: list[dict[str, Any]],
+        max_length: int,
+    ) -> list[dict[str, Any]]:
+        """Return copy of the entries with summaries shortened to the given length.
+
+        The summaries are removed if the length is 0. The entries themselves are
+        not modified, they are kept in the entry cache.
+        """
+        processor = SummaryProcessor(remove_images=False, max_length=max_length)
+        shortened_entries = []
+        for entry in entries:
+            summary = entry.get("summary")
+            if not isinstance(summary, str):
+                shortened_entries.append(entry)
+            elif not max_length:
+                shortened_entries.append(
+                    {key: value for key, value in entry.items() if key != "summary"},
+                )
+            elif len(summary) > max_length:
+                shortened_entries.append(
+                    entry
+                    | {"summary": processor.process(summary, find_image=False).text},
+                )
+            else:
+                shortened_entries.append(entry)
+        return shortened_entries
+
+    def _generate_entries(
+        self: FeedParserSensor,
+        feed_entries: list[FeedParserDict],
+    ) -> list[CompactEntry]:
+        # entries which did not change since the last update are taken from the
+        # cache, the cache is rebuilt so entries no longer in the feed are dropped
+        entry_cache: dict[tuple[str, str | None], CompactEntry] = {}
+        sensor_entries = []
+        # strings repeated in the new entries are stored once
+        strings: dict[str, str] = {}
+        reused = 0
+        for feed_entry in feed_entries:
+            cache_key = self._entry_cache_key(feed_entry)
+            if cache_key is None or cache_key in entry_cache:
+                # entry can not be identified or is a duplicate within the feed
+                sensor_entries.append(
+                    compact_entry(self._generate_sensor_entry(feed_entry), strings),
+                )
+                continue
+            if sensor_entry := self._entry_cache.get(cache_key):
+                reused += 1
+            else:
+                sensor_entry = compact_entry(
+                    self._generate_sensor_entry(feed_entry),
+                    strings,
+                )
+            if len(entry_cache) < ENTRY_CACHE_SIZE:
+                entry_cache[cache_key] = sensor_entry
+            sensor_entries.append(sensor_entry)
+        _LOGGER.debug(
+            "Feed %s: %s entries reused from the entry cache",
+            self.name,
+            reused,
+        )
+        self._entry_cache = entry_cache
+        return sensor_entries
+
+    @staticmethod
+    def _entry_cache_key(
+        feed_entry: FeedParserDict,
+    ) -> tuple[str, str | None] | None:
+        """Return key identifying the given version of the feed entry."""
+        entry_id = feed_entry.get("id") or feed_entry.get("link")
+        if not entry_id:
+            return None
+        # do not use feed_entry.get("updated"), feedparser falls back to published
+        # with a deprecation warning
+        return entry_id, dict.get(feed_entry, "updated", feed_entry.get("published"))
+
     def _generate_sensor_entry(
         self: FeedParserSensor,
         feed_entry: FeedParserDict,
     ) -> dict[str, str]:
         _LOGGER.debug("Feed %s: Generating sensor entry for %s", self.name, feed_entry)
+        projection = self._projection
         sensor_entry = {}
-        for key, value in feed_entry.items():
-            if (
-                (self._inclusions and key not in self._inclusions)
-                or ("parsed" in key)
-                or (key in self._exclusions)
-            ):
-                continue
-            if key in ["published", "updated", "created", "expired"]:
-                parsed_date: datetime = self._parse_date(value)
-                sensor_entry[key] = parsed_date.strftime(self._date_format)
-            elif key == "image":
-                sensor_entry["image"] = value.get("href")
-            else:
-                sensor_entry[key] = value
+        if projection.all_fields:
+            for key, value in feed_entry.items():
+                if key in projection.excluded or "parsed" in key:
+                    continue
+                transform = projection.transformers.get(key)
+                sensor_entry[key] = (
+                    transform(feed_entry, key, value) if transform else value
+                )
+        else:
+            # look up only the included keys, do not use the FeedParserDict aliases
+            for key, transform in projection.fields:
+                value = dict.get(feed_entry, key, _MISSING)
+                if value is _MISSING:
+                    continue
+                sensor_entry[key] = (
+                    transform(feed_entry, key, value) if transform else value
+                )
 
-        if "image" in self._inclusions and "image" not in sensor_entry:
-            sensor_entry["image"] = self._process_image(feed_entry)
+        image_needed = projection.image and "image" not in sensor_entry
+        enclosures = feed_entry.get("enclosures") if image_needed else None
+        # the summary is scanned once both to modify it and to find the image
+        # in it, the image is looked up in the summary only without enclosures
+        summary = SummaryProcessor.Result(None, None)
+        find_image = image_needed and not enclosures and "summary" in feed_entry
+        modify_summary = (
+            "summary" in sensor_entry and self._summary_processor.modifies_summary
+        )
+        if find_image or modify_summary:
+            summary = self._summary_processor.process(
+                feed_entry["summary"],
+                find_image=find_image,
+            )
+        if modify_summary:
+            sensor_entry["summary"] = summary.text
+        if image_needed:
+            sensor_entry["image"] = self._process_image(
+                feed_entry,
+                enclosures,
+                summary.image,
+            )
         if (
-            "link" in self._inclusions
+            projection.link
             and "link" not in sensor_entry
             and (processed_link := self._process_link(feed_entry))
         ):
             sensor_entry["link"] = processed_link
-        if self._remove_summary_image and "summary" in sensor_entry:
-            sensor_entry["summary"] = re.sub(
-                IMAGE_REGEX,
-                "",
-                sensor_entry["summary"],
-            )
         _LOGGER.debug("Feed %s: Generated sensor entry: %s", self.name, sensor_entry)
         return sensor_entry
 
+    def _compile_projection(self: FeedParserSensor) -> _Projection:
+        """Compile the inclusions and exclusions into the projection plan."""
+        transformers: dict[str, Callable[[FeedParserDict, str, Any], Any]] = {
+            key: self._transform_date for key in DATE_KEYS
+        }
+        transformers["image"] = self._transform_image
+        excluded = frozenset(self._exclusions)
+        return _Projection(
+            fields=tuple(
+                (key, transformers.get(key))
+                for key in dict.fromkeys(self._inclusions)
+                if key and key not in excluded and "parsed" not in key
+            ),
+            all_fields=not self._inclusions,
+            excluded=excluded,
+            transformers=transformers,
+            image="image" in self._inclusions,
+            link="link" in self._inclusions,
+        )
+
+    def _transform_date(
+        self: FeedParserSensor,
+        feed_entry: FeedParserDict,
+        key: str,
+        date: str,
+    ) -> str:
+        parsed_date: datetime = self._date_from_parsed(
+            date,
+            dict.get(feed_entry, f"{key}_parsed"),
+        ) or self._parse_date(date)
+        return _format_date(
+            parsed_date,
+            parsed_date.utcoffset(),
+            parsed_date.tzname(),
+            self._date_format,
+        )
+
+    @staticmethod
+    def _transform_image(
+        feed_entry: FeedParserDict,  # noqa: ARG004
+        key: str,  # noqa: ARG004
+        image: FeedParserDict,
+    ) -> str | None:
+        return image.get("href")
+
+    def _date_from_parsed(
+        self: FeedParserSensor,
+        date: str,
+        date_parsed: time.struct_time | None,
+    ) -> datetime | None:
+        """Return date already parsed by feedparser in the original UTC offset.
+
+        feedparser converts the parsed date to UTC, so the offset is taken from
+        the original date string. None is returned if the offset is not numeric
+        or the date has fractional seconds, which are not kept by feedparser.
+        """
+        if not date_parsed or not (match := DATE_TIME_OFFSET_REGEX.search(date)):
+            return None
+        offset = timedelta()
+        if match["sign"]:
+            offset = timedelta(hours=int(match["hours"]), minutes=int(match["minutes"]))
+            if match["sign"] == "-":
+                offset = -offset
+        parsed_time = datetime(*date_parsed[:6], tzinfo=UTC).astimezone(
+            timezone(offset),
+        )
+        if self._local_time:
+            parsed_time = dt.as_local(parsed_time)
+        return parsed_time
+
     def _parse_date(self: FeedParserSensor, date: str) -> datetime:
         try:
             parsed_time: datetime = email.utils.parsedate_to_datetime(date)
@@ -252,22 +1334,19 @@ class FeedParserSensor(SensorEntity):
         _LOGGER.debug("Feed %s: Parsed date: %s", self.name, parsed_time)
         return parsed_time
 
-    def _process_image(self: FeedParserSensor, feed_entry: FeedParserDict) -> str:
-        if feed_entry.get("enclosures"):
-            images = [
-                enc for enc in feed_entry["enclosures"] if enc.type.startswith("image/")
-            ]
+    def _process_image(
+        self: FeedParserSensor,
+        feed_entry: FeedParserDict,
+        enclosures: list[FeedParserDict] | None,
+        summary_image: str | None,
+    ) -> str:
+        if enclosures:
+            images = [enc for enc in enclosures if enc.type.startswith("image/")]
             if images:
                 # pick the first image found
                 return images[0]["href"]
-        elif "summary" in feed_entry:
-            images = re.findall(
-                IMAGE_REGEX,
-                feed_entry["summary"],
-            )
-            if images:
-                # pick the first image found
-                return images[0]
+        elif summary_image:
+            return summary_image
         _LOGGER.debug(
             "Feed %s: Image is in inclusions, but no image was found for %s",
             self.name,
@@ -288,11 +1367,38 @@ class FeedParserSensor(SensorEntity):
         return ""
 
     @property
-    def feed_entries(self: FeedParserSensor) -> list[dict[str, str]]:
-        """Return feed entries."""
-        if hasattr(self, "_entries"):
-            return self._entries
-        return []
+    def feed_entries(self: FeedParserSensor) -> list[dict[str, Any]]:
+        """Return feed entries converted to plain dicts.
+
+        If the seen entries are indexed, each entry tells whether it is new and
+        when it was seen first.
+        """
+        if not hasattr(self, "_entries"):
+            return []
+        entries = [e.as_dict() for e in self._entries]
+        for entry, flags in zip(entries, self._seen_flags, strict=False):
+            if flags:
+                is_new, first_seen = flags
+                entry[ATTR_IS_NEW] = is_new
+                entry[ATTR_FIRST_SEEN] = dt.utc_from_timestamp(first_seen)
+        return entries
+
+    @property
+    def full_parse_count(self: FeedParserSensor) -> int:
+        """Return number of updates which parsed the feed."""
+        return self._full_parse_count
+
+    @property
+    def skipped_parse_count(self: FeedParserSensor) -> int:
+        """Return number of updates which skipped parsing of an unchanged feed."""
+        return self._skipped_parse_count
+
+    def _reset_feed_cache(self: FeedParserSensor) -> None:
+        """Forget the processed feed so the next update regenerates the entries."""
+        self._fingerprint = None
+        self._entry_cache.clear()
+        if self._coordinator is not None:
+            self._coordinator.forget(self)
 
     @property
     def local_time(self: FeedParserSensor) -> bool:
@@ -303,8 +1409,411 @@ class FeedParserSensor(SensorEntity):
     def local_time(self: FeedParserSensor, value: bool) -> None:
         """Set local_time."""
         self._local_time = value
+        self._reset_feed_cache()
+
+    @property
+    def circuit_breaker(self: FeedParserSensor) -> CircuitBreaker | None:
+        """Return circuit breaker of the feed, None before the first update."""
+        return self._coordinator.breaker if self._coordinator else None
+
+    @property
+    def circuit_breakers(self: FeedParserSensor) -> dict[str, CircuitBreaker]:
+        """Return circuit breakers of the feeds by their URLs."""
+        breaker = self.circuit_breaker
+        return {self._feed: breaker} if breaker else {}
 
     @property
-    def extra_state_attributes(self: FeedParserSensor) -> dict[str, list]:
-        """Return entity specific state attributes."""
-        return {"entries": self.feed_entries}
+    def update_metrics(self: FeedParserSensor) -> UpdateMetrics | None:
+        """Return timings of the stages of the last update."""
+        return self._update_metrics
+
+    @property
+    def extra_state_attributes(self: FeedParserSensor) -> dict[str, Any]:
+        """Return entity specific state attributes.
+
+        The attributes are cached until they change, so Home Assistant gets the same
+        entries list for each state write and compares the unchanged entries by
+        identity. The entries are materialized only after they changed.
+        """
+        breakers = self.circuit_breakers
+        key = (
+            tuple(
+                (breaker.state, breaker.failures, breaker.retry_at)
+                for breaker in breakers.values()
+            ),
+            self._update_metrics if self._attribute_settings.diagnostics else None,
+        )
+        if self._attributes is not None and key == self._attributes_key:
+            return self._attributes
+        if self._entries_attribute is None:
+            self._entries_attribute = self.feed_entries
+        attributes: dict[str, Any] = {ATTR_ENTRIES: self._entries_attribute}
+        if breakers:
+            attributes[ATTR_CIRCUIT_BREAKER] = self._circuit_breaker_attribute(
+                breakers,
+            )
+        if self._attribute_settings.diagnostics and self._update_metrics:
+            attributes[CONF_DIAGNOSTICS] = self._update_metrics.as_dict()
+        self._attributes, self._attributes_key = attributes, key
+        return attributes
+
+    def _circuit_breaker_attribute(
+        self: FeedParserSensor,
+        breakers: dict[str, CircuitBreaker],
+    ) -> dict[str, Any]:
+        """Return state of the circuit breaker of the feed."""
+        return _breaker_attribute(breakers[self._feed])
+
+
+class AsyncFeedParserSensor(FeedParserSensor):
+    """Feedparser sensor fetching the feed on the event loop.
+
+    The feed is downloaded with the aiohttp client session shared by Home Assistant,
+    so polling does not hold an executor thread while waiting for the network.
+    Parsing the feed is CPU bound and still runs in the executor.
+    """
+
+    async def async_update(self: AsyncFeedParserSensor) -> None:
+        """Fetch the feed asynchronously and update the state of the sensor."""
+        _LOGGER.debug("Feed %s: Polling feed data from %s", self.name, self._feed)
+        metrics = UpdateMetrics()
+        with metrics.timed("total"):
+            data = await self._get_coordinator().async_fetch(self.hass, self, metrics)
+            await self.hass.async_add_executor_job(self._process_data, data, metrics)
+        self._publish_metrics(metrics)
+        self._schedule_snapshot_save()
+        self._schedule_seen_save()
+
+
+class AggregateFeedParserSensor(FeedParserSensor):
+    """Feedparser sensor merging the entries of several feeds into one timeline.
+
+    The feeds are fetched concurrently, each through the coordinator it shares with
+    the other sensors of the feed. The entries are merged by their date, newest
+    first, with a k-way merge which stops after `show_topn` entries. An entry
+    posted to several feeds is shown once, it is recognized by its id or link.
+    The merged entries are generated as the entries of a single feed.
+
+    The coordinators do not keep the feeds the sensors already got, so the sensor
+    keeps the newest `show_topn` entries of each feed to merge them again when
+    another feed changes.
+
+    Each feed has its own circuit breaker, the sensor has no single breaker.
+    """
+
+    def __init__(
+        self: AggregateFeedParserSensor,
+        feeds: list[str],
+        name: str,
+        **settings: Any,  # noqa: ANN401
+    ) -> None:
+        """Initialize the aggregate sensor."""
+        self._feeds = feeds
+        self._coordinators: list[FeedCoordinator] | None = None
+        self._timelines: dict[str, _Timeline] = {}
+        super().__init__(", ".join(feeds), name, **settings)
+
+    @classmethod
+    def from_config(
+        cls: type[AggregateFeedParserSensor],
+        config: Mapping[str, Any],
+    ) -> AggregateFeedParserSensor:
+        """Create the sensor merging the feeds from the validated configuration."""
+        return cls(
+            config[CONF_FEED_URL],
+            config[CONF_NAME],
+            **_settings_from_config(config),
+        )
+
+    def update(self: AggregateFeedParserSensor) -> None:
+        """Do not update the sensor in a thread, the feeds are fetched on the loop."""
+        raise NotImplementedError
+
+    async def async_update(self: AggregateFeedParserSensor) -> None:
+        """Fetch the feeds concurrently on the event loop and update the sensor."""
+        _LOGGER.debug("Feed %s: Polling feed data from %s", self.name, self._feed)
+        metrics = UpdateMetrics()
+        with metrics.timed("total"):
+            coordinators = self._get_coordinators()
+            fetches = [UpdateMetrics() for _ in coordinators]
+            feeds = await asyncio.gather(
+                *(
+                    coordinator.async_fetch(self.hass, self, fetch)
+                    for coordinator, fetch in zip(coordinators, fetches, strict=True)
+                ),
+            )
+            await self.hass.async_add_executor_job(
+                self._process_feeds,
+                feeds,
+                fetches,
+                metrics,
+            )
+        self._publish_metrics(metrics)
+        self._schedule_seen_save()
+
+    @property
+    def circuit_breakers(
+        self: AggregateFeedParserSensor,
+    ) -> dict[str, CircuitBreaker]:
+        """Return circuit breakers of the feeds by their URLs."""
+        return {
+            coordinator.url: coordinator.breaker
+            for coordinator in self._coordinators or ()
+        }
+
+    def _circuit_breaker_attribute(
+        self: AggregateFeedParserSensor,
+        breakers: dict[str, CircuitBreaker],
+    ) -> dict[str, Any]:
+        """Return states of the circuit breakers by the URLs of the feeds."""
+        return {url: _breaker_attribute(breaker) for url, breaker in breakers.items()}
+
+    def _get_coordinators(
+        self: AggregateFeedParserSensor,
+    ) -> list[FeedCoordinator]:
+        """Return coordinators fetching the feeds."""
+        if self._coordinators is None:
+            self._coordinators = [self._register_coordinator(f) for f in self._feeds]
+        return self._coordinators
+
+    def _register_feeds(self: AggregateFeedParserSensor) -> None:
+        """Register the sensor with the coordinators of its feeds."""
+        self._get_coordinators()
+
+    def _fetch_options(self: AggregateFeedParserSensor) -> FetchOptions:
+        """Return options of the sensor affecting how the feeds are fetched."""
+        # the feeds are merged in-process
+        return super()._fetch_options()._replace(process_pool_threshold=None)
+
+    def _filter_entries(
+        self: AggregateFeedParserSensor,
+        feed_entries: list[FeedParserDict],
+    ) -> list[FeedParserDict]:
+        """Return the merged entries, they were filtered while merged."""
+        return feed_entries
+
+    async def async_will_remove_from_hass(self: AggregateFeedParserSensor) -> None:
+        """Stop sharing the feeds with the other sensors."""
+        for coordinator in self._coordinators or ():
+            self._unregister_coordinator(coordinator)
+        self._coordinators = None
+
+    def _process_feeds(
+        self: AggregateFeedParserSensor,
+        feeds: list[FeedData | None],
+        fetches: list[UpdateMetrics],
+        metrics: UpdateMetrics,
+    ) -> None:
+        """Merge the feeds unless none of them changed and process them.
+
+        The feeds which were not fetched are merged with their last entries. The
+        parses of the feeds are recorded in the metrics of their fetches.
+        """
+        for coordinator, data, fetch in zip(
+            self._get_coordinators(),
+            feeds,
+            fetches,
+            strict=True,
+        ):
+            timeline = self._timelines.get(coordinator.url)
+            if data is None or (timeline and timeline.fingerprint == data.fingerprint):
+                continue
+            self._timelines[coordinator.url] = _Timeline(
+                data.fingerprint,
+                self._timeline(coordinator.parse(data, fetch)),
+            )
+        metrics.add_fetches(fetches)
+        timelines = [
+            timeline
+            for feed in self._feeds
+            if (timeline := self._timelines.get(feed)) is not None
+        ]
+        if not timelines:
+            self._process_data(None, metrics)
+            return
+        fingerprint = hashlib.blake2b(
+            b"".join(timeline.fingerprint for timeline in timelines),
+            digest_size=16,
+        ).digest()
+        parsed_feed = None
+        if fingerprint != self._fingerprint:
+            parsed_feed = self._merge([timeline.entries for timeline in timelines])
+        self._process_data(
+            FeedData(
+                content=b"",
+                content_type="",
+                fingerprint=fingerprint,
+                parsed_feed=parsed_feed,
+            ),
+            metrics,
+        )
+
+    def _timeline(
+        self: AggregateFeedParserSensor,
+        parsed_feed: FeedParserDict,
+    ) -> list[FeedParserDict]:
+        """Return the newest `show_topn` filtered entries of the feed, newest first."""
+        # the feeds are usually ordered already, sorting them is cheap then
+        feed_entries = sorted(parsed_feed.entries, key=_entry_date, reverse=True)
+        if self._entry_filter:
+            feed_entries = list(filter(self._entry_filter.matches, feed_entries))
+        return list(islice(_unique_entries(feed_entries), self._show_topn))
+
+    def _merge(
+        self: AggregateFeedParserSensor,
+        timelines: list[list[FeedParserDict]],
+    ) -> FeedParserDict:
+        """Return feed of the newest `show_topn` entries of the timelines."""
+        entries = islice(
+            _unique_entries(heapq.merge(*timelines, key=_entry_date, reverse=True)),
+            self._show_topn,
+        )
+        return FeedParserDict(feed=FeedParserDict(), entries=list(entries))
+
+
+class SummaryProcessor:
+    """Process HTML summaries of feed entries in a single pass.
+
+    The first image found in the summary is extracted while the images are being
+    removed from it. The summary can also be shortened to the given length.
+    """
+
+    class Result(NamedTuple):
+        """Processed summary and the first image URL found in it."""
+
+        text: str | None
+        image: str | None
+
+    def __init__(
+        self: SummaryProcessor,
+        remove_images: bool,
+        max_length: int | None = None,
+    ) -> None:
+        """Initialize the summary processor."""
+        self.remove_images = remove_images
+        self.max_length = max_length
+
+    @property
+    def modifies_summary(self: SummaryProcessor) -> bool:
+        """Return whether the processed summary differs from the original one."""
+        return self.remove_images or bool(self.max_length)
+
+    def process(
+        self: SummaryProcessor,
+        summary: str,
+        *,
+        find_image: bool,
+    ) -> SummaryProcessor.Result:
+        """Return the processed summary and the first image URL found in it."""
+        image = None
+        if self.remove_images:
+            pieces = []
+            end = 0
+            for match in IMAGE_PATTERN.finditer(summary):
+                if image is None:
+                    image = match[1]
+                pieces.append(summary[end : match.start()])
+                end = match.end()
+            if pieces:
+                pieces.append(summary[end:])
+                summary = "".join(pieces)
+        elif find_image and (match := IMAGE_PATTERN.search(summary)):
+            image = match[1]
+        if self.max_length and len(summary) > self.max_length:
+            summary = self._truncate(summary)
+        return self.Result(summary, image if find_image else None)
+
+    def _truncate(self: SummaryProcessor, summary: str) -> str:
+        summary = summary[: self.max_length]
+        # do not leave a tag cut in half at the end of the summary
+        if summary.rfind("<") > summary.rfind(">"):
+            summary = summary[: summary.rfind("<")]
+        return summary.rstrip() + SUMMARY_ELLIPSIS
+
+
+def _breaker_attribute(breaker: CircuitBreaker) -> dict[str, Any]:
+    """Return state of the circuit breaker shown in the attributes of the sensor."""
+    return {
+        "state": breaker.state,
+        "failures": breaker.failures,
+        "retry_at": breaker.retry_at and dt.utc_from_timestamp(breaker.retry_at),
+    }
+
+
+class _Timeline(NamedTuple):
+    """Newest entries of a feed merged by the aggregate sensor."""
+
+    fingerprint: bytes
+    entries: list[FeedParserDict]
+
+
+class _WorkerResult(NamedTuple):
+    """Sensor state and entries generated in a worker process."""
+
+    native_value: int | None
+    entries: list[CompactEntry]
+    entry_ids: frozenset[str]
+    shown_entry_ids: tuple[str | None, ...]
+    update_period: float | None
+
+
+def _process_feed_in_worker(
+    config: dict[str, Any],
+    content: bytes,
+    content_type: str,
+    time_zone: str,
+) -> _WorkerResult:
+    """Parse the feed and generate the sensor entries in a worker process.
+
+    Return the state of the sensor and its compact entries.
+    """
+    if default_time_zone := dt.get_time_zone(time_zone):
+        dt.set_default_time_zone(default_time_zone)
+    feed_sensor = FeedParserSensor(**config)
+    feed_sensor._process_feed(parse_feed(content, content_type))  # noqa: SLF001
+    return _WorkerResult(
+        native_value=feed_sensor.native_value,  # type: ignore[arg-type]
+        entries=feed_sensor._entries,  # noqa: SLF001
+        entry_ids=feed_sensor._entry_ids,  # noqa: SLF001
+        shown_entry_ids=feed_sensor._shown_entry_ids,  # noqa: SLF001
+        update_period=feed_sensor._update_period,  # noqa: SLF001
+    )
+
+
+def _entry_date(feed_entry: FeedParserDict) -> tuple[int, ...]:
+    """Return sort key of the feed entry by its date, undated entries sort first."""
+    # do not use feed_entry.get("updated_parsed"), feedparser falls back to
+    # published_parsed with a deprecation warning
+    date = dict.get(feed_entry, "published_parsed") or dict.get(
+        feed_entry,
+        "updated_parsed",
+    )
+    return (1, *date[:6]) if date else (0,)
+
+
+def _unique_entries(
+    feed_entries: Iterable[FeedParserDict],
+) -> Iterator[FeedParserDict]:
+    """Yield the entries except those with the id or link of a previous entry."""
+    seen: set[str] = set()
+    for entry in feed_entries:
+        keys = {key for key in (entry.get("id"), entry.get("link")) if key}
+        if not keys & seen:
+            seen |= keys
+            yield entry
+
+
+@lru_cache(maxsize=4096)
+def _format_date(
+    date: datetime,
+    utcoffset: timedelta | None,  # noqa: ARG001
+    tzname: str | None,  # noqa: ARG001
+    date_format: str,
+) -> str:
+    """Format the date, results are cached for the same moment in the same time zone.
+
+    Aware datetimes are equal when they represent the same moment, the UTC offset and
+    the time zone name are part of the cache key so dates from different time zones
+    are not mixed up.
+    """
+    return date.strftime(date_format)
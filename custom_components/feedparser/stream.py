@@ -0,0 +1,127 @@
+"""Incremental reading of feed documents."""
+from __future__ import annotations
+
+import logging
+from xml.parsers import expat
+
+CHUNK_SIZE = 16 * 1024
+ENTRY_TAGS = frozenset({"item", "entry"})
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class FeedTooLargeError(Exception):
+    """Raised when the feed document exceeds the maximum allowed size."""
+
+
+class _EntriesReadError(Exception):
+    """Raised from the expat handlers to stop parsing once all entries were read."""
+
+
+class ContentReader:
+    """Collect the feed document from the chunks of the response body.
+
+    If `max_entries` is set, the chunks are scanned with an expat parser as they
+    arrive. Once the closing tag of the `max_entries`-th top-level item or entry
+    element is seen, the reader reports it is done and the document is cut right
+    after that tag. The elements which are still open get closed, so the parser
+    gets a well-formed document containing only the first `max_entries` entries.
+
+    Documents expat can not handle (e.g. HTML entities without a DTD) are read
+    completely and passed through unchanged.
+
+    Reading a document larger than `max_size` bytes raises FeedTooLargeError.
+    """
+
+    def __init__(
+        self: ContentReader,
+        max_entries: int | None = None,
+        max_size: int | None = None,
+    ) -> None:
+        """Initialize the reader."""
+        self._chunks: list[bytes] = []
+        self._size = 0
+        self._max_size = max_size
+        self._max_entries = max_entries
+        self._entries = 0
+        self._open_tags: list[str] = []
+        self._entry_depth: int | None = None
+        self._last_entry_end: int | None = None
+        self._scanning = max_entries is not None
+        if self._scanning:
+            self._parser = expat.ParserCreate()
+            self._parser.StartElementHandler = self._start_element
+            self._parser.EndElementHandler = self._end_element
+
+    @property
+    def done(self: ContentReader) -> bool:
+        """Return whether all the requested entries were read."""
+        return self._last_entry_end is not None
+
+    @property
+    def cut_after(self: ContentReader) -> int | None:
+        """Return number of the entries the document is cut after, None if not cut."""
+        return self._entries if self.done else None
+
+    @property
+    def content(self: ContentReader) -> bytes:
+        """Return the feed document read so far."""
+        content = b"".join(self._chunks)
+        if self._last_entry_end is None:
+            return content
+        end = content.index(b">", self._last_entry_end) + 1
+        closing_tags = "".join(f"</{tag}>" for tag in reversed(self._open_tags))
+        return content[:end] + closing_tags.encode()
+
+    @property
+    def size(self: ContentReader) -> int:
+        """Return number of bytes read."""
+        return self._size
+
+    def check_size(self: ContentReader, content_length: str | int | None) -> None:
+        """Check the announced size of the document before reading it."""
+        if self._max_size and content_length and int(content_length) > self._max_size:
+            msg = (
+                f"Feed size of {content_length} bytes exceeds "
+                f"the limit of {self._max_size} bytes"
+            )
+            raise FeedTooLargeError(msg)
+
+    def feed(self: ContentReader, chunk: bytes) -> bool:
+        """Consume the next chunk of the document, return whether reading is done."""
+        if not self._chunks and chunk[:2] in (b"\xff\xfe", b"\xfe\xff"):
+            # closing tags can be appended to ASCII compatible documents only
+            self._scanning = False
+        self._size += len(chunk)
+        if self._max_size and self._size > self._max_size:
+            msg = f"Feed exceeds the size limit of {self._max_size} bytes"
+            raise FeedTooLargeError(msg)
+        self._chunks.append(chunk)
+        if self._scanning:
+            try:
+                self._parser.Parse(chunk, False)  # noqa: FBT003
+            except _EntriesReadError:
+                self._scanning = False
+            except expat.ExpatError as err:
+                _LOGGER.debug("Unable to scan the feed incrementally: %s", err)
+                self._scanning = False
+        return self.done
+
+    def _start_element(
+        self: ContentReader,
+        name: str,
+        attrs: dict[str, str],  # noqa: ARG002
+    ) -> None:
+        if self._entry_depth is None and name.rpartition(":")[2] in ENTRY_TAGS:
+            self._entry_depth = len(self._open_tags)
+        self._open_tags.append(name)
+
+    def _end_element(self: ContentReader, name: str) -> None:  # noqa: ARG002
+        self._open_tags.pop()
+        if self._entry_depth != len(self._open_tags):
+            return
+        self._entry_depth = None
+        self._entries += 1
+        if self._entries >= self._max_entries:  # type: ignore[operator]
+            self._last_entry_end = self._parser.CurrentByteIndex
+            raise _EntriesReadError
@@ -0,0 +1,78 @@
+"""Pool of worker processes processing large feeds outside of the GIL."""
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+DEFAULT_MAX_WORKERS = 2
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+
+class ProcessPool:
+    """Start worker processes on first use and run functions in them.
+
+    The workers are spawned rather than forked, forking the multi-threaded Home
+    Assistant process is not safe. The arguments and results of the functions must
+    be picklable.
+    """
+
+    def __init__(
+        self: ProcessPool,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> None:
+        """Initialize the process pool."""
+        self._max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self.submitted = 0
+
+    def __repr__(self: ProcessPool) -> str:
+        """Return the representation."""
+        return (
+            f"ProcessPool(max_workers={self._max_workers}, "
+            f"started={self._executor is not None})"
+        )
+
+    def submit(
+        self: ProcessPool,
+        func: Callable[..., Any],
+        *args: Any,  # noqa: ANN401
+    ) -> Future:
+        """Run the function with the given arguments in a worker process.
+
+        The workers are restarted when one of them was terminated abruptly, which
+        breaks the whole pool.
+        """
+        with self._lock:
+            self.submitted += 1
+            try:
+                return self._start().submit(func, *args)
+            except BrokenProcessPool:
+                _LOGGER.warning("A worker process was terminated, restarting them")
+                self._executor = None
+                return self._start().submit(func, *args)
+
+    def _start(self: ProcessPool) -> ProcessPoolExecutor:
+        """Return the executor, start the worker processes unless they run."""
+        if self._executor is None:
+            _LOGGER.debug("Starting %s worker processes", self._max_workers)
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def close(self: ProcessPool) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(cancel_futures=True)
+                self._executor = None
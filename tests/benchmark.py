@@ -0,0 +1,238 @@
+"""Benchmark the stages of feed processing on the recorded test feeds.
+
+Run from the repository root with `PYTHONPATH=. python tests/benchmark.py`. Each
+stage is timed separately for each feed, the feeds are read from `tests/data`, so
+the benchmark runs offline.
+
+Store the results as the baseline with `--save-baseline`. Later runs compare their
+results with the baseline and fail if a stage got slower by more than the threshold.
+A run fails also if there is no baseline to compare with.
+
+The `parse_text` and `summary_regex` stages time the replaced implementations of
+the `parse` and `summary` stages for comparison.
+"""
+import argparse
+import json
+import re
+import sys
+import timeit
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import feedparser
+from constants import TEST_FEEDS
+from feedsource import FeedSource
+from requests.compat import chardet
+
+from custom_components.feedparser.coordinator import parse_feed
+from custom_components.feedparser.sensor import (
+    DATE_KEYS,
+    IMAGE_REGEX,
+    SESSION_POOL,
+    FeedParserSensor,
+    SummaryProcessor,
+    _format_date,
+)
+
+NUMBER = 5
+REPEAT = 5
+CONTENT_TYPE = "application/rss+xml"
+BASELINE_PATH = Path(__file__).parent / "benchmark_baseline.json"
+DEFAULT_THRESHOLD = 0.2
+# differences below this number of milliseconds are considered noise
+NOISE_FLOOR = 0.05
+
+
+class Benchmark(NamedTuple):
+    """Function to time and the preparation of its input from the feed."""
+
+    prepare: Callable[[FeedSource], Any]
+    run: Callable[[Any], object]
+
+
+class Regression(NamedTuple):
+    """Stage which got slower than in the baseline."""
+
+    feed: str
+    stage: str
+    baseline: float
+    result: float
+
+
+def feed_sensor(feed: FeedSource) -> FeedParserSensor:
+    """Return sensor configured for the local copy of the feed."""
+    return FeedParserSensor.from_config(feed.sensor_config_local_feed)
+
+
+def parsed_feed(feed: FeedSource) -> tuple[FeedParserSensor, Any]:
+    """Return sensor of the feed together with the parsed feed."""
+    return feed_sensor(feed), parse_feed(feed.path.read_bytes(), CONTENT_TYPE)
+
+
+def dates(feed: FeedSource) -> tuple[FeedParserSensor, list[tuple[Any, str, str]]]:
+    """Return sensor of the feed together with the dates of its entries."""
+    feed_sensor_, parsed = parsed_feed(feed)
+    return feed_sensor_, [
+        (entry, key, entry[key])
+        for entry in parsed.entries
+        for key in DATE_KEYS
+        if key in entry
+    ]
+
+
+def summaries(feed: FeedSource) -> list[str]:
+    """Return summaries of the feed entries."""
+    parsed = parse_feed(feed.path.read_bytes(), CONTENT_TYPE)
+    return [e.summary for e in parsed.entries if "summary" in e]
+
+
+def fetch(uri: str) -> None:
+    """Download the feed document with the pooled session."""
+    with SESSION_POOL.session(uri) as s:
+        s.get(uri).content  # noqa: B018
+
+
+def parse(content: bytes) -> None:
+    """Parse the raw feed document."""
+    parse_feed(content, CONTENT_TYPE)
+
+
+def parse_text(content: bytes) -> None:
+    """Decode the document the way requests does and parse the resulting text."""
+    text = str(content, chardet.detect(content)["encoding"], errors="replace")
+    feedparser.parse(text)
+
+
+def generate(prepared: tuple[FeedParserSensor, Any]) -> None:
+    """Generate the sensor entries without reusing cached ones."""
+    feed_sensor_, parsed = prepared
+    feed_sensor_._entry_cache.clear()  # noqa: SLF001
+    feed_sensor_._process_feed(parsed)  # noqa: SLF001
+
+
+def transform_dates(
+    prepared: tuple[FeedParserSensor, list[tuple[Any, str, str]]],
+) -> None:
+    """Parse and format the dates of the entries without the format cache."""
+    feed_sensor_, entry_dates = prepared
+    _format_date.cache_clear()
+    for entry, key, date in entry_dates:
+        feed_sensor_._transform_date(entry, key, date)  # noqa: SLF001
+
+
+def process_summaries(entry_summaries: list[str]) -> None:
+    """Find the first image and remove images with the summary processor."""
+    processor = SummaryProcessor(remove_images=True)
+    for summary in entry_summaries:
+        processor.process(summary, find_image=True)
+
+
+def summary_regex(entry_summaries: list[str]) -> None:
+    """Find the first image and remove images with separate regex scans."""
+    for summary in entry_summaries:
+        re.findall(IMAGE_REGEX, summary)
+        re.sub(IMAGE_REGEX, "", summary)
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "fetch": Benchmark(lambda feed: feed.path.absolute().as_uri(), fetch),
+    "parse": Benchmark(lambda feed: feed.path.read_bytes(), parse),
+    "parse_text": Benchmark(lambda feed: feed.path.read_bytes(), parse_text),
+    "generate": Benchmark(parsed_feed, generate),
+    "dates": Benchmark(dates, transform_dates),
+    "summary": Benchmark(summaries, process_summaries),
+    "summary_regex": Benchmark(summaries, summary_regex),
+}
+
+
+def run(
+    feeds: list[FeedSource],
+    number: int = NUMBER,
+    repeat: int = REPEAT,
+) -> dict[str, dict[str, float]]:
+    """Time the stages on each feed and return the results in milliseconds."""
+    results = {}
+    print(f"{'feed':<24}{'size':>10}", *(f"{name:>14}" for name in BENCHMARKS))
+    for feed in feeds:
+        results[feed.name] = timings = {
+            name: min(
+                timeit.repeat(
+                    partial(benchmark.run, benchmark.prepare(feed)),
+                    number=number,
+                    repeat=repeat,
+                ),
+            )
+            / number
+            * 1000
+            for name, benchmark in BENCHMARKS.items()
+        }
+        print(
+            f"{feed.name:<24}{feed.path.stat().st_size:>10}",
+            *(f"{timing:>14.3f}" for timing in timings.values()),
+        )
+    return results
+
+
+def find_regressions(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    threshold: float = DEFAULT_THRESHOLD,
+) -> list[Regression]:
+    """Return stages slower than in the baseline by more than the threshold."""
+    return [
+        Regression(feed, stage, baseline_timing, timing)
+        for feed, timings in results.items()
+        for stage, timing in timings.items()
+        if (baseline_timing := baseline.get(feed, {}).get(stage)) is not None
+        and timing > baseline_timing * (1 + threshold)
+        and timing - baseline_timing > NOISE_FLOOR
+    ]
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark, return non-zero exit status if a stage regressed.
+
+    The exit status is 2 if there is no baseline to compare with.
+    """
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    arg_parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help="store the results as the new baseline",
+    )
+    arg_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed relative slowdown of a stage, e.g. 0.2 for 20%%",
+    )
+    arg_parser.add_argument("--number", type=int, default=NUMBER)
+    arg_parser.add_argument("--repeat", type=int, default=REPEAT)
+    args = arg_parser.parse_args(argv)
+    if not args.save_baseline and not args.baseline.exists():
+        print(f"No baseline in {args.baseline}, store one with --save-baseline")
+        return 2
+
+    results = run([FeedSource(f) for f in TEST_FEEDS], args.number, args.repeat)
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline stored in {args.baseline}")
+        return 0
+    regressions = find_regressions(
+        results,
+        json.loads(args.baseline.read_text()),
+        args.threshold,
+    )
+    for regression in regressions:
+        print(
+            f"{regression.feed}: {regression.stage} regressed from "
+            f"{regression.baseline:.3f} ms to {regression.result:.3f} ms",
+        )
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,14 @@
 """Pytest configuration."""
+import asyncio
+from collections.abc import Awaitable, Callable, Generator
+from pathlib import Path
+from typing import Any
 
 import pytest
 from constants import TEST_FEEDS
+from feedserver import FeedServer
 from feedsource import FeedSource
+from homeassistant.core import HomeAssistant
 
 from custom_components.feedparser.sensor import FeedParserSensor
 
@@ -42,7 +48,7 @@ def feed(request: pytest.FixtureRequest) -> FeedSource:
 @pytest.fixture()
 def feed_sensor(feed: FeedSource) -> FeedParserSensor:
     """Return feed sensor initialized with the local RSS feed."""
-    return FeedParserSensor(**feed.sensor_config_local_feed)
+    return FeedParserSensor.from_config(feed.sensor_config_local_feed)
 
 
 @pytest.fixture()
@@ -51,3 +57,29 @@ def feed_with_image_in_summary(
 ) -> FeedSource:
     """Return feed sensor with images in summary of its entries."""
     return request.param
+
+
+@pytest.fixture()
+def feed_server() -> Generator[FeedServer, None, None]:
+    """Return local HTTP server serving the test feeds."""
+    with FeedServer() as server:
+        yield server
+
+
+@pytest.fixture()
+def run_with_hass(
+    tmp_path: Path,
+) -> Callable[[Callable[[HomeAssistant], Awaitable[Any]]], Any]:
+    """Return function running a coroutine function with a Home Assistant instance."""
+
+    def run(func: Callable[[HomeAssistant], Awaitable[Any]]) -> Any:  # noqa: ANN401
+        async def _run() -> Any:  # noqa: ANN401
+            hass = HomeAssistant(str(tmp_path))
+            try:
+                return await func(hass)
+            finally:
+                await hass.async_stop(force=True)
+
+        return asyncio.run(_run())
+
+    return run
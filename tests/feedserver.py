@@ -0,0 +1,88 @@
+"""Local HTTP server serving the recorded feeds to be used in tests."""
+import email.utils
+import hashlib
+import sys
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+
+from constants import DATA_PATH
+from feedsource import FeedSource
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    """Serve feed files from the test data directory."""
+
+    server: "FeedServer"
+
+    def do_GET(self: "FeedRequestHandler") -> None:
+        """Respond with the requested feed file."""
+        time.sleep(self.server.delay)
+        if self.server.failures:
+            status = self.server.failures.pop(0)
+            self.server.statuses.append(status)
+            self.send_error(status)
+            return
+        path = DATA_PATH / self.path.lstrip("/")
+        if not path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        body = path.read_bytes()
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        last_modified = email.utils.formatdate(path.stat().st_mtime, usegmt=True)
+        if self.server.send_validators and (
+            self.headers.get("If-None-Match") == etag
+            or self.headers.get("If-Modified-Since") == last_modified
+        ):
+            self.server.statuses.append(HTTPStatus.NOT_MODIFIED)
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.end_headers()
+            return
+        self.server.statuses.append(HTTPStatus.OK)
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(body)))
+        if self.server.send_validators:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self: "FeedRequestHandler", *args: object) -> None:
+        """Do not log requests to stderr."""
+
+
+class FeedServer(ThreadingHTTPServer):
+    """Local HTTP server running in a background thread."""
+
+    def __init__(self: "FeedServer", *, send_validators: bool = True) -> None:
+        """Initialize."""
+        super().__init__(("127.0.0.1", 0), FeedRequestHandler)
+        self.send_validators = send_validators
+        self.statuses: list[HTTPStatus] = []
+        # statuses of the error responses sent before the feed is served again
+        self.failures: list[HTTPStatus] = []
+        # seconds to wait before responding
+        self.delay = 0.0
+        self._thread = Thread(target=self.serve_forever, daemon=True)
+
+    def __enter__(self: "FeedServer") -> "FeedServer":
+        """Start serving in the background."""
+        self._thread.start()
+        return self
+
+    def __exit__(self: "FeedServer", *args: object) -> None:
+        """Stop serving."""
+        self.shutdown()
+        self.server_close()
+
+    def handle_error(self: "FeedServer", request: object, address: object) -> None:
+        """Ignore clients which gave up waiting for the response."""
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, address)
+
+    def url_for(self: "FeedServer", feed: FeedSource) -> str:
+        """Return URL of the given feed on this server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/{feed.path.name}"
@@ -136,9 +136,9 @@ class FeedSource:
     def feed_parser_sensor_config(
         self: "FeedSource",
     ) -> dict[str, str | int | bool | list[str]]:
-        """Generate sensor config for the FeedParserSensor constructor."""
+        """Generate sensor config for FeedParserSensor.from_config."""
         return self._common_config | {
-            "feed": self.url,
+            "feed_url": self.url,
             "scan_interval": self.sensor_config.scan_interval,
         }
 
@@ -146,8 +146,10 @@ class FeedSource:
     def sensor_config_local_feed(
         self: "FeedSource",
     ) -> dict[str, str | int | bool | list[str]]:
-        """Gen. sensor config for the FeedParserSensor constructor with local feed."""
-        return self.feed_parser_sensor_config | {"feed": self.path.absolute().as_uri()}
+        """Generate sensor config for FeedParserSensor.from_config with local feed."""
+        return self.feed_parser_sensor_config | {
+            "feed_url": self.path.absolute().as_uri(),
+        }
 
     @property
     def ha_config_entry(self: "FeedSource") -> dict[str, Any]:
@@ -0,0 +1,83 @@
+"""Tests the adaptive scan interval."""
+import feedparser
+import pytest
+
+from custom_components.feedparser.adaptive import (
+    BACKOFF_FACTOR,
+    AdaptiveInterval,
+    cache_max_age,
+    feed_update_period,
+)
+
+SY_NAMESPACE = 'xmlns:sy="http://purl.org/rss/1.0/modules/syndication/"'
+
+
+@pytest.mark.parametrize(
+    ("channel", "period"),
+    [
+        ("", None),
+        ("<ttl>15</ttl>", 900),
+        ("<sy:updatePeriod>daily</sy:updatePeriod>", 86400),
+        (
+            "<sy:updatePeriod>hourly</sy:updatePeriod>"
+            "<sy:updateFrequency>4</sy:updateFrequency>",
+            900,
+        ),
+        ("<ttl>60</ttl><sy:updatePeriod>daily</sy:updatePeriod>", 86400),
+        ("<ttl>often</ttl>", None),
+        ("<sy:updatePeriod>sometimes</sy:updatePeriod>", None),
+    ],
+)
+def test_feed_update_period(channel: str, period: float | None) -> None:
+    """Test that the update period announced by the feed is found."""
+    parsed_feed = feedparser.parse(
+        f'<rss version="2.0" {SY_NAMESPACE}><channel>{channel}'
+        "<item><title>entry</title></item></channel></rss>",
+    )
+    assert feed_update_period(parsed_feed) == period
+
+
+@pytest.mark.parametrize(
+    ("cache_control", "max_age"),
+    [
+        ("", None),
+        ("no-cache", None),
+        ("public, max-age=300", 300),
+        ("s-maxage=60, max-age=120", 120),
+    ],
+)
+def test_cache_max_age(cache_control: str, max_age: int | None) -> None:
+    """Test that max-age is read from the Cache-Control header."""
+    assert cache_max_age({"Cache-Control": cache_control}) == max_age
+
+
+def test_adaptive_interval() -> None:
+    """Test that the interval follows the rate of new entries."""
+    interval = AdaptiveInterval(scan_interval=3600, min_interval=60, max_interval=86400)
+    assert interval.interval == 3600  # noqa: PLR2004
+
+    # the entries of the first poll are the baseline
+    interval.observe(0, 10)
+    assert interval.interval == 3600  # noqa: PLR2004
+    interval.observe(600, 2)
+    assert interval.interval == pytest.approx(300)
+
+    # back off while the feed does not change
+    interval.observe(900, 0)
+    interval.observe(1500, 0)
+    assert interval.interval == pytest.approx(300 * BACKOFF_FACTOR**2)
+    interval.observe(2100, 3)
+    assert interval.unchanged_polls == 0
+
+    # the feed is not polled more often than it announces
+    interval.update_period = 7200
+    assert interval.interval == 7200  # noqa: PLR2004
+    interval.max_age = 10800
+    assert interval.interval == 10800  # noqa: PLR2004
+
+    # the interval is bounded
+    interval.max_age = 10**6
+    assert interval.interval == 86400  # noqa: PLR2004
+    interval.max_age = interval.update_period = None
+    interval.observe(2101, 100)
+    assert interval.interval == 60  # noqa: PLR2004
@@ -0,0 +1,25 @@
+"""Tests the regression check of the benchmark."""
+from typing import TYPE_CHECKING
+
+from benchmark import Regression, find_regressions, main
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_find_regressions() -> None:
+    """Test that only stages slower than the threshold allows are reported."""
+    baseline = {"feed": {"parse": 10.0, "dates": 0.01}, "old_feed": {"parse": 1.0}}
+    results = {
+        "feed": {"parse": 12.5, "dates": 0.05, "summary": 1.0},
+        "new_feed": {"parse": 100.0},
+    }
+    assert find_regressions(results, baseline, threshold=0.2) == [
+        Regression("feed", "parse", 10.0, 12.5),
+    ]
+    assert not find_regressions(results, baseline, threshold=0.3)
+
+
+def test_missing_baseline(tmp_path: "Path") -> None:
+    """Test that the benchmark fails without a baseline to compare with."""
+    assert main(["--baseline", str(tmp_path / "baseline.json")]) == 2  # noqa: PLR2004
@@ -0,0 +1,45 @@
+"""Tests the circuit breaker."""
+from custom_components.feedparser.breaker import (
+    BACKOFF_BASE,
+    FAILURE_THRESHOLD,
+    BreakerState,
+    CircuitBreaker,
+)
+
+COOLDOWN = 3600
+
+
+def test_backoff() -> None:
+    """Test that the delay after a failure doubles with each consecutive failure."""
+    breaker = CircuitBreaker()
+    assert breaker.allow_request(0)
+    breaker.record_failure(0, COOLDOWN)
+    assert breaker.state == BreakerState.CLOSED
+    assert not breaker.allow_request(BACKOFF_BASE - 1)
+    assert breaker.allow_request(BACKOFF_BASE)
+    breaker.record_failure(100, COOLDOWN)
+    assert breaker.retry_at == 100 + 2 * BACKOFF_BASE
+
+    breaker.record_success()
+    assert breaker.failures == 0
+    assert breaker.allow_request(100)
+
+
+def test_open_and_close() -> None:
+    """Test that the breaker opens after consecutive failures and closes again."""
+    breaker = CircuitBreaker()
+    for _ in range(FAILURE_THRESHOLD):
+        breaker.record_failure(0, COOLDOWN)
+    assert breaker.state == BreakerState.OPEN
+    assert not breaker.allow_request(COOLDOWN - 1)
+
+    # the failed trial fetch opens the breaker again
+    assert breaker.allow_request(COOLDOWN)
+    assert breaker.state == BreakerState.HALF_OPEN
+    breaker.record_failure(COOLDOWN, COOLDOWN)
+    assert breaker.state == BreakerState.OPEN
+    assert breaker.retry_at == 2 * COOLDOWN
+
+    assert breaker.allow_request(2 * COOLDOWN)
+    breaker.record_success()
+    assert breaker.state == BreakerState.CLOSED
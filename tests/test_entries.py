@@ -0,0 +1,111 @@
+"""Tests the compact sensor entries."""
+import gc
+import pickle
+import tracemalloc
+
+import pytest
+from constants import TEST_FEEDS
+from feedsource import FeedSource
+
+from custom_components.feedparser import entries
+from custom_components.feedparser.coordinator import parse_feed
+from custom_components.feedparser.entries import CompactEntry, compact_entry
+from custom_components.feedparser.sensor import FeedParserSensor, _format_date
+
+CONTENT_TYPE = "application/rss+xml"
+MIN_COMPARED_ENTRIES = 10
+
+
+def test_compact_entry() -> None:
+    """Test that the compact entry keeps the items of the entry."""
+    entry = {
+        "title": "Title",
+        "title_detail": {"type": "text/plain", "value": "Title"},
+        "tags": [{"term": "news"}, {"term": "world"}],
+    }
+    compact = compact_entry(entry)
+    assert compact == entry
+    assert compact["title"] == "Title"
+    assert "link" not in compact
+    assert compact.get("link") is None
+    with pytest.raises(KeyError):
+        compact["link"]
+    assert list(compact) == list(entry)
+    assert isinstance(compact["title_detail"], CompactEntry)
+    assert compact["tags"][1]["term"] == "world"
+
+    materialized = compact.as_dict()
+    assert materialized == entry
+    assert type(materialized["title_detail"]) is dict
+    assert type(materialized["tags"]) is list
+
+    # entries with the same keys share the key tuple
+    other = compact_entry(entry | {"title": "Other"})
+    assert other._keys is compact._keys  # noqa: SLF001
+    assert other != compact
+    unpickled = pickle.loads(pickle.dumps(compact))
+    assert unpickled == compact
+    assert unpickled._keys is compact._keys  # noqa: SLF001
+
+
+def test_strings_shared() -> None:
+    """Test that equal strings of the compacted entries are stored once."""
+    strings: dict[str, str] = {}
+    first, second = (
+        compact_entry({"type": "".join(["text/", "html"])}, strings) for _ in range(2)
+    )
+    assert first["type"] is second["type"]
+
+
+def _retained_size(
+    feed_sensor: FeedParserSensor,
+    content: bytes,
+    *,
+    compact: bool,
+) -> int:
+    """Return memory retained by the entries generated from the feed.
+
+    The shared key tuples are dropped first, so they are counted in the memory
+    of the compact entries.
+    """
+    _format_date.cache_clear()
+    entries._KEY_TUPLES.clear()  # noqa: SLF001
+    gc.collect()
+    tracemalloc.start()
+    try:
+        parsed_feed = parse_feed(content, CONTENT_TYPE)
+        generate_sensor_entry = feed_sensor._generate_sensor_entry  # noqa: SLF001
+        sensor_entries = [generate_sensor_entry(e) for e in parsed_feed.entries]
+        if compact:
+            strings: dict[str, str] = {}
+            sensor_entries = [compact_entry(e, strings) for e in sensor_entries]
+        del parsed_feed
+        _format_date.cache_clear()
+        gc.collect()
+        return tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+
+def test_memory_reduced() -> None:
+    """Test that the compact entries take less memory than the generated dicts.
+
+    The dicts keep the nested feedparser objects of the parsed feed alive.
+    """
+    dict_size = compact_size = 0
+    for feed in map(FeedSource, TEST_FEEDS):
+        feed_sensor = FeedParserSensor.from_config(
+            feed.sensor_config_local_feed | {"inclusions": []},
+        )
+        content = feed.path.read_bytes()
+        # warm up the caches of the modules with both representations
+        for compact in (False, True):
+            _retained_size(feed_sensor, content, compact=compact)
+        feed_dict_size = _retained_size(feed_sensor, content, compact=False)
+        feed_compact_size = _retained_size(feed_sensor, content, compact=True)
+        # the entries of the feeds with a few entries differ too little to compare
+        if len(parse_feed(content, CONTENT_TYPE).entries) >= MIN_COMPARED_ENTRIES:
+            assert feed_compact_size < feed_dict_size * 0.95, feed.name
+        dict_size += feed_dict_size
+        compact_size += feed_compact_size
+    assert compact_size < dict_size * 0.8
@@ -0,0 +1,60 @@
+"""Tests the entry filters."""
+from feedparser import FeedParserDict
+
+from custom_components.feedparser.filters import EntryFilter
+
+ENTRY = FeedParserDict(
+    title="Storm hits the coast",
+    summary="Heavy rain and wind are expected tonight.",
+    tags=[FeedParserDict(term="Weather"), FeedParserDict(term="Netherlands")],
+)
+
+
+def test_no_rules() -> None:
+    """Test that all the entries pass the filter without rules."""
+    entry_filter = EntryFilter()
+    assert not entry_filter
+    assert entry_filter.matches(ENTRY)
+
+
+def test_include() -> None:
+    """Test that the entry passes if any include rule matches it."""
+    assert EntryFilter(include=["football", "storm"]).matches(ENTRY)
+    assert EntryFilter(include=[r"rain\b"]).matches(ENTRY)
+    assert not EntryFilter(include=["football", "tennis"]).matches(ENTRY)
+
+
+def test_fields() -> None:
+    """Test that the rules are searched for in the configured fields only."""
+    assert not EntryFilter(include=[{"pattern": "rain", "fields": ["title"]}]).matches(
+        ENTRY,
+    )
+    assert EntryFilter(include=[{"pattern": "rain", "fields": ["summary"]}]).matches(
+        ENTRY,
+    )
+    assert EntryFilter(
+        include=[{"pattern": "^weather$", "fields": ["category"]}],
+    ).matches(ENTRY)
+    # the entries without the field do not match
+    assert not EntryFilter(include=["storm"]).matches(FeedParserDict(link="/"))
+
+
+def test_exclude() -> None:
+    """Test that the entry is filtered out if any exclude rule matches it."""
+    assert not EntryFilter(exclude=["sports", "WIND"]).matches(ENTRY)
+    assert EntryFilter(exclude=[{"pattern": "wind", "fields": ["title"]}]).matches(
+        ENTRY,
+    )
+    # the exclude rules take precedence over the include rules
+    assert not EntryFilter(include=["storm"], exclude=["coast"]).matches(ENTRY)
+
+
+def test_uncombined_patterns() -> None:
+    """Test the patterns which can not be combined with the others."""
+    # global inline flags are valid only at the start of the expression
+    assert EntryFilter(include=["football", "(?s)storm.*coast"]).matches(ENTRY)
+    assert not EntryFilter(include=["(?x) foot ball"]).matches(ENTRY)
+    # numbered backreferences keep referring to the groups of their pattern
+    entry = FeedParserDict(title="Bye bye")
+    assert EntryFilter(include=["(x)y", r"(bye) \1"]).matches(entry)
+    assert not EntryFilter(exclude=[r"(storm)", r"(bye) \1"]).matches(entry)
@@ -0,0 +1,54 @@
+"""Tests the pool of HTTP sessions."""
+from feedserver import FeedServer
+from feedsource import FeedSource
+
+from custom_components.feedparser.pool import SessionPool
+from custom_components.feedparser.sensor import (
+    REQUEST_HEADERS,
+    SESSION_POOL,
+    USER_AGENT,
+    FeedParserSensor,
+)
+
+
+def test_session_reused_for_same_host(feed_server: FeedServer) -> None:
+    """Test that requests to the same host share a single session."""
+    pool = SessionPool(headers=REQUEST_HEADERS)
+    url = f"http://{feed_server.server_address[0]}:{feed_server.server_address[1]}"
+    with pool.session(f"{url}/CTK.xml") as first:
+        pass
+    with pool.session(f"{url}/zive.xml") as second:
+        pass
+    assert first is second
+    assert first.headers["User-Agent"] == USER_AGENT
+    assert first.headers["Accept-Encoding"] == "gzip, deflate"
+    assert pool.stats == {"hits": 1, "misses": 1, "evictions": 0, "sessions": 1}
+
+
+def test_idle_session_evicted() -> None:
+    """Test that idle sessions are closed and removed from the pool."""
+    pool = SessionPool(headers=REQUEST_HEADERS, idle_timeout=0)
+    with pool.session("https://www.nu.nl/rss") as first:
+        # a session in use is never evicted
+        with pool.session("https://www.zive.cz/rss/sc-47/"):
+            pass
+        with pool.session("https://www.nu.nl/rss/Algemeen") as second:
+            assert first is second
+    with pool.session("https://www.nu.nl/rss") as third:
+        assert third is not first
+    assert pool.stats == {"hits": 1, "misses": 3, "evictions": 2, "sessions": 1}
+
+
+def test_sensors_share_pooled_session(
+    feed: FeedSource,
+    feed_server: FeedServer,
+) -> None:
+    """Test that sensors fetching from the same host reuse the pooled session."""
+    hits = SESSION_POOL.hits
+    for _ in range(2):
+        feed_sensor = FeedParserSensor.from_config(
+            feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)},
+        )
+        feed_sensor.update()
+        assert feed_sensor.feed_entries
+    assert SESSION_POOL.hits > hits
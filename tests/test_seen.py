@@ -0,0 +1,37 @@
+"""Tests the index of the seen entries."""
+from custom_components.feedparser.seen import SeenIndex
+
+
+def test_new_entries() -> None:
+    """Test that the index tells the new entries and when they were seen first."""
+    index = SeenIndex(max_size=10)
+    assert index.observe("https://example.com/1", 100) == (True, 100)
+    assert index.observe("https://example.com/1", 200) == (False, 100)
+    assert index.observe("https://example.com/2", 200) == (True, 200)
+    assert len(index) == 2  # noqa: PLR2004
+    assert index.version == 2  # noqa: PLR2004
+
+
+def test_least_recently_seen_forgotten() -> None:
+    """Test that the index keeps its size by forgetting the least recently seen."""
+    index = SeenIndex(max_size=2)
+    index.observe("first", 1)
+    index.observe("second", 2)
+    # seeing the first entry again keeps it in the index
+    index.observe("first", 3)
+    index.observe("third", 4)
+    assert len(index) == 2  # noqa: PLR2004
+    assert index.observe("first", 5) == (False, 1)
+    assert index.observe("second", 6) == (True, 6)
+
+
+def test_restore() -> None:
+    """Test that the stored index is restored within the size of the index."""
+    index = SeenIndex(max_size=3)
+    for time, entry_id in enumerate(("first", "second", "third")):
+        index.observe(entry_id, time)
+    restored = SeenIndex(max_size=2)
+    restored.restore([list(item) for item in index.items()])
+    assert len(restored) == 2  # noqa: PLR2004
+    assert restored.observe("third", 10) == (False, 2)
+    assert restored.observe("first", 10) == (True, 10)
@@ -1,24 +1,49 @@
 """"Tests the feedparser sensor."""
 
+import asyncio
 import re
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
 from contextlib import nullcontext, suppress
-from datetime import UTC, datetime
-from typing import TYPE_CHECKING
+from datetime import UTC, datetime, timedelta
+from functools import partial
+from http import HTTPStatus
+from itertools import pairwise
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
 
 import feedparser
 import pytest
-from constants import DATE_FORMAT, URLS_HEADERS_REQUIRED
+import voluptuous as vol
+from constants import DATE_FORMAT, TEST_FEEDS, URLS_HEADERS_REQUIRED
 from feedsource import FeedSource
+from homeassistant.helpers import entity
+from homeassistant.helpers.json import json_bytes
 
+from custom_components.feedparser import coordinator, sensor
+from custom_components.feedparser.breaker import FAILURE_THRESHOLD, BreakerState
+from custom_components.feedparser.metrics import UpdateMetrics, add_metrics_listener
 from custom_components.feedparser.sensor import (
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_THUMBNAIL,
     IMAGE_REGEX,
+    AggregateFeedParserSensor,
+    AsyncFeedParserSensor,
+    AttributeSettings,
     FeedParserSensor,
+    PollingSettings,
+    SummaryProcessor,
 )
 
 if TYPE_CHECKING:
     import time
+    from collections.abc import Callable
+    from pathlib import Path
+
+    from feedserver import FeedServer
+    from homeassistant.core import Event, HomeAssistant
+
+    from custom_components.feedparser.coordinator import FeedCoordinator
 
 
 def test_simple(feed_sensor: FeedParserSensor) -> None:
@@ -32,13 +57,17 @@ def test_update_sensor(feed: FeedSource) -> None:
     feed_sensor = FeedParserSensor(
         feed=feed.path.absolute().as_uri(),
         name=feed.name,
-        date_format=feed.sensor_config.date_format,
-        local_time=feed.sensor_config.local_time,
-        show_topn=feed.sensor_config.show_topn,
-        remove_summary_image=feed.sensor_config.remove_summary_image,
-        inclusions=feed.sensor_config.inclusions,
-        exclusions=feed.sensor_config.exclusions,
-        scan_interval=feed.sensor_config.scan_interval,
+        attributes=AttributeSettings(
+            date_format=feed.sensor_config.date_format,
+            local_time=feed.sensor_config.local_time,
+            show_topn=feed.sensor_config.show_topn,
+            remove_summary_image=feed.sensor_config.remove_summary_image,
+            inclusions=feed.sensor_config.inclusions,
+            exclusions=feed.sensor_config.exclusions,
+        ),
+        polling=PollingSettings(
+            scan_interval=feed.sensor_config.scan_interval_timedelta,
+        ),
     )
     feed_sensor.update()
     assert feed_sensor.feed_entries
@@ -97,13 +126,15 @@ def test_update_sensor_with_topn(feed: FeedSource) -> None:
     feed_sensor = FeedParserSensor(
         feed=feed.path.absolute().as_uri(),
         name=feed.name,
-        date_format=DATE_FORMAT,
-        local_time=False,
-        show_topn=show_topn,
-        remove_summary_image=False,
-        inclusions=["image", "title", "link", "published"],
-        exclusions=[],
-        scan_interval=DEFAULT_SCAN_INTERVAL,
+        attributes=AttributeSettings(
+            date_format=DATE_FORMAT,
+            local_time=False,
+            show_topn=show_topn,
+            remove_summary_image=False,
+            inclusions=["image", "title", "link", "published"],
+            exclusions=[],
+        ),
+        polling=PollingSettings(scan_interval=DEFAULT_SCAN_INTERVAL),
     )
     feed_sensor.update()
     assert feed_sensor.feed_entries
@@ -174,13 +205,15 @@ def test_fetch_data_headers_required(online_feed: dict) -> None:
     feed_sensor = FeedParserSensor(
         feed=online_feed["url"],
         name=online_feed["name"],
-        date_format=DATE_FORMAT,
-        local_time=False,
-        show_topn=9999,
-        remove_summary_image=False,
-        inclusions=["image", "title", "link", "published"],
-        exclusions=[],
-        scan_interval=DEFAULT_SCAN_INTERVAL,
+        attributes=AttributeSettings(
+            date_format=DATE_FORMAT,
+            local_time=False,
+            show_topn=9999,
+            remove_summary_image=False,
+            inclusions=["image", "title", "link", "published"],
+            exclusions=[],
+        ),
+        polling=PollingSettings(scan_interval=DEFAULT_SCAN_INTERVAL),
     )
     feed_sensor.update()
     assert feed_sensor.feed_entries
@@ -191,8 +224,8 @@ def test_remove_summary_image(
 ) -> None:
     """Test that the sensor removes the image from the summary."""
     feed = feed_with_image_in_summary
-    feed_sensor = FeedParserSensor(
-        **feed.sensor_config_local_feed | {"remove_summary_image": False},
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"remove_summary_image": False},
     )
     feed_sensor.update()
     assert feed_sensor.feed_entries
@@ -203,8 +236,8 @@ def test_remove_summary_image(
         for e in feed_sensor.feed_entries
     )
 
-    feed_sensor = FeedParserSensor(
-        **feed.sensor_config_local_feed | {"remove_summary_image": True},
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"remove_summary_image": True},
     )
     feed_sensor.update()
     assert feed_sensor.feed_entries
@@ -216,10 +249,1173 @@ def test_remove_summary_image(
 def test_image_not_in_entries(feed: FeedSource) -> None:
     """Test that the sensor does not include the image in any feed entry."""
     # keep only the title in the inclusions
-    feed_sensor = FeedParserSensor(
-        **feed.sensor_config_local_feed | {"inclusions": ["title"]},
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"inclusions": ["title"]},
     )
     feed_sensor.update()
     assert feed_sensor.feed_entries
     # assert that the sensor does not include the image in its feed entries
     assert all("image" not in e for e in feed_sensor.feed_entries)
+
+
+def test_async_update(
+    feed: FeedSource,
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the async update path yields the same entries as the sync one."""
+    config = feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)}
+    feed_sensor = FeedParserSensor.from_config(config)
+    feed_sensor.update()
+    async_feed_sensor = AsyncFeedParserSensor.from_config(config)
+
+    async def async_update(hass: "HomeAssistant") -> None:
+        async_feed_sensor.hass = hass
+        await async_feed_sensor.async_update()
+
+    run_with_hass(async_update)
+    assert async_feed_sensor.feed_entries
+    assert async_feed_sensor.feed_entries == feed_sensor.feed_entries
+
+
+def test_conditional_get(
+    feed: FeedSource,
+    feed_server: "FeedServer",
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a feed which was not modified is neither downloaded nor parsed."""
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)},
+    )
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+
+    parse_calls = []
+    monkeypatch.setattr(
+        coordinator.feedparser,
+        "parse",
+        lambda *args, **_: parse_calls.append(args),
+    )
+    not_modified_polls = 3
+    for _ in range(not_modified_polls):
+        feed_sensor.update()
+    assert (
+        feed_server.statuses
+        == [HTTPStatus.OK]
+        + [
+            HTTPStatus.NOT_MODIFIED,
+        ]
+        * not_modified_polls
+    )
+    assert not parse_calls
+    assert feed_sensor.feed_entries == entries
+    assert feed_sensor.full_parse_count == 1
+    assert feed_sensor.skipped_parse_count == not_modified_polls
+
+
+def test_async_conditional_get(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the async update path sends a conditional request as well."""
+    feed = FeedSource(TEST_FEEDS[0])
+    feed_sensor = AsyncFeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)},
+    )
+
+    async def async_update(hass: "HomeAssistant") -> None:
+        feed_sensor.hass = hass
+        await feed_sensor.async_update()
+        await feed_sensor.async_update()
+
+    run_with_hass(async_update)
+    assert feed_server.statuses == [HTTPStatus.OK, HTTPStatus.NOT_MODIFIED]
+    assert feed_sensor.feed_entries
+
+
+def _start_adding(hass: "HomeAssistant", *feed_sensors: FeedParserSensor) -> None:
+    """Start adding the sensors to hass, they register with their coordinators."""
+    for feed_sensor in feed_sensors:
+        feed_sensor.add_to_platform_start(hass, None, None)  # type: ignore[arg-type]
+
+
+def test_shared_feed(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that sensors of the same feed share its download and parsing."""
+    feed = FeedSource(TEST_FEEDS[0])
+    url = feed_server.url_for(feed)
+    config = feed.sensor_config_local_feed | {"feed_url": url}
+    title_sensor = FeedParserSensor.from_config(
+        config | {"inclusions": ["title"], "scan_interval": 3600},
+    )
+    link_sensor = FeedParserSensor.from_config(
+        config | {"inclusions": ["link"], "scan_interval": 600},
+    )
+
+    async def async_update(hass: "HomeAssistant") -> "FeedCoordinator":
+        _start_adding(hass, title_sensor, link_sensor)
+        for feed_sensor in (title_sensor, link_sensor):
+            await hass.async_add_executor_job(feed_sensor.update)
+        feed_coordinator = hass.data[sensor.DOMAIN][url]
+        assert feed_coordinator.update_interval == timedelta(seconds=600)
+        assert feed_server.statuses == [HTTPStatus.OK]
+        # the feed is not kept once all the sensors got it
+        assert feed_coordinator.data is None
+        # the sensor which already got the feed fetches it again
+        await hass.async_add_executor_job(title_sensor.update)
+        await link_sensor.async_will_remove_from_hass()
+        assert feed_coordinator.update_interval == timedelta(seconds=3600)
+        await title_sensor.async_will_remove_from_hass()
+        assert url not in hass.data[sensor.DOMAIN]
+        return feed_coordinator
+
+    feed_coordinator = run_with_hass(async_update)
+    assert feed_server.statuses == [HTTPStatus.OK, HTTPStatus.NOT_MODIFIED]
+    assert feed_coordinator.fetch_count == 2  # noqa: PLR2004
+    assert feed_coordinator.parse_count == 1
+    assert title_sensor.feed_entries
+    assert all(e.keys() == {"title"} for e in title_sensor.feed_entries)
+    assert all(e.keys() == {"link"} for e in link_sensor.feed_entries)
+    assert len(title_sensor.feed_entries) == len(link_sensor.feed_entries)
+
+
+@pytest.mark.parametrize("async_first", [False, True])
+def test_shared_feed_sync_and_async(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+    async_first: bool,
+) -> None:
+    """Test that a sync and an async sensor of the same feed do not both fetch it."""
+    feed = FeedSource(TEST_FEEDS[0])
+    url = feed_server.url_for(feed)
+    config = feed.sensor_config_local_feed | {"feed_url": url}
+    feed_sensor = FeedParserSensor.from_config(config)
+    async_feed_sensor = AsyncFeedParserSensor.from_config(config)
+    feed_server.delay = 0.2
+
+    async def update(hass: "HomeAssistant") -> None:
+        _start_adding(hass, feed_sensor, async_feed_sensor)
+        updates = [
+            partial(hass.async_add_executor_job, feed_sensor.update),
+            async_feed_sensor.async_update,
+        ]
+        if async_first:
+            updates.reverse()
+        first_update = asyncio.ensure_future(updates[0]())
+        # the first sensor starts fetching the feed before the second one updates
+        await asyncio.sleep(0.05)
+        await asyncio.gather(first_update, updates[1]())
+
+    run_with_hass(update)
+    assert feed_server.statuses == [HTTPStatus.OK]
+    assert feed_sensor.feed_entries
+    assert async_feed_sensor.feed_entries == feed_sensor.feed_entries
+
+
+def test_cached_attributes(feed_server: "FeedServer") -> None:
+    """Test that the attributes are rebuilt only when they change."""
+    feed = FeedSource(TEST_FEEDS[0])
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)},
+    )
+    feed_sensor.update()
+    attributes = feed_sensor.extra_state_attributes
+    assert attributes["entries"] == feed_sensor.feed_entries
+    assert feed_sensor.extra_state_attributes is attributes
+
+    # the feed was not modified
+    feed_sensor.update()
+    assert feed_sensor.extra_state_attributes is attributes
+
+    # a change of the circuit breaker keeps the entries
+    breaker = feed_sensor.circuit_breaker
+    assert breaker
+    breaker.record_failure(0)
+    changed_attributes = feed_sensor.extra_state_attributes
+    assert changed_attributes is not attributes
+    assert changed_attributes["circuit_breaker"]["failures"] == 1
+    assert changed_attributes["entries"] is attributes["entries"]
+
+    # regenerated entries are materialized again
+    breaker.record_success()
+    feed_sensor.local_time = True
+    feed_sensor.update()
+    assert feed_sensor.extra_state_attributes["entries"] is not attributes["entries"]
+
+
+def test_update_metrics(feed_server: "FeedServer") -> None:
+    """Test that durations of the update stages are recorded and published."""
+    feed = FeedSource(TEST_FEEDS[0])
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed
+        | {"feed_url": feed_server.url_for(feed), "diagnostics": True},
+    )
+    published: list[tuple[FeedParserSensor, UpdateMetrics]] = []
+
+    def failing_listener(*_: object) -> None:
+        raise RuntimeError
+
+    remove_listeners = [
+        add_metrics_listener(failing_listener),
+        add_metrics_listener(lambda *args: published.append(args)),
+    ]
+    try:
+        feed_sensor.update()
+        feed_sensor.update()
+    finally:
+        for remove_listener in remove_listeners:
+            remove_listener()
+
+    assert [p[0] for p in published] == [feed_sensor, feed_sensor]
+    first, second = (p[1] for p in published)
+    assert first.bytes_downloaded == len(feed.path.read_bytes())
+    assert first.entries == len(feed_sensor.feed_entries)
+    assert None not in (first.fetch, first.parse, first.generate, first.total)
+    # the feed was not modified, so it was neither parsed nor processed
+    assert second.fetch is not None
+    assert second.parse is second.generate is None
+    assert second.bytes_downloaded == 0
+    assert not first.not_modified
+    assert second.not_modified
+    assert (first.full_parse_count, first.skipped_parse_count) == (1, 0)
+    assert (second.full_parse_count, second.skipped_parse_count) == (1, 1)
+    assert feed_sensor.update_metrics is second
+    assert feed_sensor.extra_state_attributes["diagnostics"] == second.as_dict()
+    assert second.as_dict().keys() == {
+        "fetch_ms",
+        "parse_ms",
+        "generate_ms",
+        "total_ms",
+        "bytes_downloaded",
+        "not_modified",
+        "entries",
+        "full_parse_count",
+        "skipped_parse_count",
+    }
+
+
+def test_persist_entries(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the entries are restored from the snapshot without fetching."""
+    feed = FeedSource(TEST_FEEDS[0])
+    config = feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)}
+
+    async def update(hass: "HomeAssistant") -> FeedParserSensor:
+        feed_sensor = FeedParserSensor.from_config(config | {"persist_entries": True})
+        feed_sensor.hass = hass
+        assert not await feed_sensor.async_restore_snapshot()
+        await hass.async_add_executor_job(feed_sensor.update)
+        return feed_sensor
+
+    async def restore(
+        hass: "HomeAssistant",
+        **kwargs: object,
+    ) -> tuple[bool, FeedParserSensor]:
+        feed_sensor = FeedParserSensor.from_config(
+            config | kwargs | {"persist_entries": True},
+        )
+        feed_sensor.hass = hass
+        restored = await feed_sensor.async_restore_snapshot()
+        return restored, feed_sensor
+
+    async def restore_and_update(hass: "HomeAssistant") -> FeedParserSensor:
+        restored, feed_sensor = await restore(hass)
+        assert restored
+        assert feed_server.statuses == [HTTPStatus.OK]
+        assert feed_sensor.feed_entries == entries
+        assert feed_sensor.native_value == len(entries)
+        # new entries are told from the restored ones
+        assert feed_sensor._entry_ids  # noqa: SLF001
+        await hass.async_add_executor_job(feed_sensor.update)
+        return feed_sensor
+
+    entries = run_with_hass(update).feed_entries
+    assert entries
+    feed_sensor = run_with_hass(restore_and_update)
+    # the feed was fetched with the restored validators and was not modified
+    assert feed_server.statuses == [HTTPStatus.OK, HTTPStatus.NOT_MODIFIED]
+    assert feed_sensor.feed_entries == entries
+    assert feed_sensor.full_parse_count == 0
+
+    # entries generated with a different configuration are not restored
+    restored, feed_sensor = run_with_hass(partial(restore, inclusions=["title"]))
+    assert not restored
+    assert not feed_sensor.feed_entries
+
+
+def test_staggered_poll_times() -> None:
+    """Test that staggered sensors spread their polls deterministically."""
+    config = FeedSource(TEST_FEEDS[0]).sensor_config_local_feed | {
+        "scan_interval": 3600,
+    }
+    now = datetime(2024, 1, 1, tzinfo=UTC).timestamp()
+
+    def poll_times(name: str) -> list[float]:
+        feed_sensor = FeedParserSensor.from_config(config | {"name": name})
+        times = [feed_sensor._next_poll_time(now, first=True)]  # noqa: SLF001
+        times.extend(
+            feed_sensor._next_poll_time(times[-1], first=False)  # noqa: SLF001
+            for _ in range(24)
+        )
+        return times
+
+    times = poll_times("feed")
+    assert times == poll_times("feed")
+    assert now <= times[0] < now + sensor.FIRST_POLL_WINDOW
+    max_jitter = 3600 * sensor.POLL_JITTER
+    for previous, poll_time in pairwise(times[1:]):
+        assert 3600 - 2 * max_jitter <= poll_time - previous <= 3600 + 2 * max_jitter
+
+    # the polls of the sensors are spread over the scan interval
+    phases = {round(poll_times(f"feed {i}")[-1] % 3600, -2) for i in range(10)}
+    assert len(phases) > 5  # noqa: PLR2004
+
+
+def test_staggered_polling(run_with_hass: "Callable") -> None:
+    """Test that staggered sensors poll themselves with a shared update limit."""
+    config = FeedSource(TEST_FEEDS[0]).sensor_config_local_feed
+    feed_sensors = [
+        FeedParserSensor.from_config(
+            config | {"name": name, "staggered_polling": True},
+        )
+        for name in ("first", "second")
+    ]
+
+    async def add_to_hass(hass: "HomeAssistant") -> None:
+        for feed_sensor in feed_sensors:
+            feed_sensor.hass = hass
+            await feed_sensor.async_added_to_hass()
+            assert feed_sensor._unsub_poll  # noqa: SLF001
+            feed_sensor._cancel_poll()  # noqa: SLF001
+
+    run_with_hass(add_to_hass)
+    first, second = feed_sensors
+    assert not first.should_poll
+    assert isinstance(first.parallel_updates, asyncio.Semaphore)
+    assert first.parallel_updates is second.parallel_updates
+
+
+@pytest.mark.parametrize("process_pool_threshold", [None, 1])
+def test_adaptive_polling(process_pool_threshold: int | None) -> None:
+    """Test that the adaptive sensor honors the update period of the feed."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "bbc_europe")
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed
+        | {
+            "scan_interval": 600,
+            "adaptive_polling": True,
+            "process_pool_threshold": process_pool_threshold,
+        },
+    )
+    assert not feed_sensor.should_poll
+    feed_sensor.update()
+    adaptive = feed_sensor._adaptive  # noqa: SLF001
+    assert adaptive
+    # the feed announces a ttl of 15 minutes
+    assert adaptive.update_period == 900  # noqa: PLR2004
+    assert adaptive.interval == 900  # noqa: PLR2004
+
+    # the unchanged feed is polled less often
+    feed_sensor.update()
+    assert adaptive.unchanged_polls == 1
+    assert adaptive.interval == 1800  # noqa: PLR2004
+    next_poll = feed_sensor._next_poll_time(0, first=False)  # noqa: SLF001
+    assert next_poll == pytest.approx(1800, rel=sensor.POLL_JITTER)
+
+
+@pytest.mark.parametrize("process_pool_threshold", [None, 1])
+def test_new_entry_events(
+    process_pool_threshold: int | None,
+    tmp_path: "Path",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that new entries fire events and the state is written on changes only."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "bbc_europe")
+    content = feed.path.read_text()
+    feed_path = tmp_path / feed.path.name
+    # the first poll does not see the first entry of the feed
+    feed_path.write_text(re.sub(r"<item>.*?</item>", "", content, count=1, flags=re.S))
+
+    class FeedSensor(FeedParserSensor):
+        state_writes = 0
+
+        def async_write_ha_state(self: "FeedSensor") -> None:
+            self.state_writes += 1
+
+    feed_sensor = FeedSensor.from_config(
+        feed.sensor_config_local_feed
+        | {
+            "feed_url": feed_path.as_uri(),
+            "new_entry_events": True,
+            "process_pool_threshold": process_pool_threshold,
+        },
+    )
+    feed_sensor.entity_id = "sensor.bbc_europe"
+    # the sensor is polled by Home Assistant like the sensors without the events
+    assert feed_sensor.should_poll
+    assert not feed_sensor.force_update
+
+    async def poll(hass: "HomeAssistant") -> list["Event"]:
+        feed_sensor.hass = hass
+        events = []
+        hass.bus.async_listen(sensor.EVENT_NEW_ENTRY, events.append)
+        await feed_sensor.async_update_ha_state(force_refresh=True)
+        await hass.async_block_till_done()
+        return events
+
+    assert not run_with_hass(poll)
+    assert feed_sensor.state_writes == 1
+    # the unchanged feed does not write the state
+    assert not run_with_hass(poll)
+    assert feed_sensor.state_writes == 1
+
+    feed_path.write_text(content)
+    events = run_with_hass(poll)
+    assert feed_sensor.state_writes == 2  # noqa: PLR2004
+    assert len(events) == 1
+    first_entry = feed_sensor.feed_entries[0]
+    assert events[0].data == {
+        "entity_id": "sensor.bbc_europe",
+        "id": feedparser.parse(content).entries[0].id,
+        "title": first_entry["title"],
+        "link": first_entry["link"],
+        "published": first_entry["published"],
+    }
+
+
+def test_new_entry_events_shared_feed(
+    tmp_path: "Path",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the events fire when another sensor fetched the new entries."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "bbc_europe")
+    content = feed.path.read_text()
+    feed_path = tmp_path / feed.path.name
+    feed_path.write_text(re.sub(r"<item>.*?</item>", "", content, count=1, flags=re.S))
+    config = feed.sensor_config_local_feed | {"feed_url": feed_path.as_uri()}
+
+    class FeedSensor(FeedParserSensor):
+        def async_write_ha_state(self: "FeedSensor") -> None:
+            pass
+
+    event_sensor = FeedSensor.from_config(config | {"new_entry_events": True})
+    event_sensor.entity_id = "sensor.bbc_europe_events"
+    feed_sensor = FeedParserSensor.from_config(config)
+
+    async def update(hass: "HomeAssistant") -> list["Event"]:
+        events = []
+        hass.bus.async_listen(sensor.EVENT_NEW_ENTRY, events.append)
+        event_sensor.hass = feed_sensor.hass = hass
+        await event_sensor.async_update_ha_state(force_refresh=True)
+        feed_path.write_text(content)
+        # the other sensor fetches the changed feed and asks the sensor to update
+        await hass.async_add_executor_job(feed_sensor.update)
+        await hass.async_block_till_done()
+        return events
+
+    events = run_with_hass(update)
+    assert [event.data["id"] for event in events] == [
+        feedparser.parse(content).entries[0].id,
+    ]
+
+
+def test_seen_entries(tmp_path: "Path", run_with_hass: "Callable") -> None:
+    """Test that the entries tell whether they are new, also after a restart."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "nu_nl")
+    content = feed.path.read_text()
+    feed_path = tmp_path / feed.path.name
+    # the first poll does not see the first entry of the feed
+    feed_path.write_text(re.sub(r"<item>.*?</item>", "", content, count=1, flags=re.S))
+    config = feed.sensor_config_local_feed | {"feed_url": feed_path.as_uri()}
+
+    async def update(hass: "HomeAssistant") -> list[dict[str, Any]]:
+        feed_sensor = FeedParserSensor.from_config(config | {"seen_index_size": 100})
+        feed_sensor.hass = hass
+        await feed_sensor.async_restore_seen_entries()
+        entries = []
+        for _ in range(2):
+            await hass.async_add_executor_job(feed_sensor.update)
+            entries.append(feed_sensor.feed_entries)
+        return entries
+
+    first, second = run_with_hass(update)
+    assert first
+    assert all(e["is_new"] for e in first)
+    assert not any(e["is_new"] for e in second)
+    assert [e["first_seen"] for e in first] == [e["first_seen"] for e in second]
+
+    # the index was stored, only the entry added to the feed is new after restart
+    feed_path.write_text(content)
+    entries, _ = run_with_hass(update)
+    assert [e["is_new"] for e in entries] == [True] + [False] * (len(entries) - 1)
+    assert entries[1]["first_seen"] == first[0]["first_seen"]
+
+
+def test_aggregate_sensor(
+    tmp_path: "Path",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the aggregate sensor merges the newest entries of the feeds."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "nu_nl")
+    content = feed.path.read_text()
+    items = re.findall(r"<item>.*?</item>", content, flags=re.S)
+    head = content[: content.index(items[0])]
+    tail = content[content.index(items[-1]) + len(items[-1]) :]
+    # the feeds share some of the entries
+    feed_paths = [tmp_path / "first.xml", tmp_path / "second.xml"]
+    feed_paths[0].write_text(head + "".join(items[:18]) + tail)
+    feed_paths[1].write_text(head + "".join(items[12:]) + tail)
+    show_topn = 10
+    config = feed.sensor_config_local_feed | {
+        "feed_url": [path.as_uri() for path in feed_paths],
+        "show_topn": show_topn,
+    }
+    feed_sensor = AggregateFeedParserSensor.from_config(
+        config | {"inclusions": ["title", "link", "published"]},
+    )
+
+    async def update(
+        hass: "HomeAssistant",
+        updated_sensor: AggregateFeedParserSensor = feed_sensor,
+    ) -> None:
+        updated_sensor.hass = hass
+        await updated_sensor.async_update()
+
+    for _ in range(2):
+        run_with_hass(update)
+
+    newest_entries = sorted(
+        feedparser.parse(content).entries,
+        key=lambda e: e.published_parsed,
+        reverse=True,
+    )[:show_topn]
+    assert feed_sensor.native_value == show_topn
+    assert [e["link"] for e in feed_sensor.feed_entries] == [
+        e.link for e in newest_entries
+    ]
+    # the unchanged feeds are not merged again
+    assert feed_sensor.full_parse_count == 1
+    assert feed_sensor.skipped_parse_count == 1
+    metrics = feed_sensor.update_metrics
+    assert metrics
+    assert metrics.entries == show_topn
+
+    # the merged entries are filtered before the newest ones are taken
+    filtered_sensor = AggregateFeedParserSensor.from_config(
+        config | {"entry_exclusions": [re.escape(newest_entries[0].title)]},
+    )
+    run_with_hass(partial(update, updated_sensor=filtered_sensor))
+    assert filtered_sensor.native_value == show_topn
+    assert filtered_sensor.feed_entries[0]["link"] == newest_entries[1].link
+
+
+def test_aggregate_sensor_not_modified(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the aggregate sensor merges the feeds which were not modified."""
+    feeds = [FeedSource(feed) for feed in TEST_FEEDS[:2]]
+    feed_sensor = AggregateFeedParserSensor.from_config(
+        feeds[0].sensor_config_local_feed
+        | {"feed_url": [feed_server.url_for(feed) for feed in feeds], "show_topn": 10},
+    )
+
+    async def update(hass: "HomeAssistant") -> list[dict[str, Any]]:
+        feed_sensor.hass = hass
+        await feed_sensor.async_update()
+        entries = feed_sensor.feed_entries
+        # the entries are merged again from the kept entries of the feeds
+        feed_sensor.local_time = True
+        await feed_sensor.async_update()
+        return entries
+
+    entries = run_with_hass(update)
+    assert len(entries) == 10  # noqa: PLR2004
+    assert feed_server.statuses[2:] == [HTTPStatus.NOT_MODIFIED] * 2
+    assert feed_sensor.full_parse_count == 2  # noqa: PLR2004
+    assert [e["link"] for e in feed_sensor.feed_entries] == [e["link"] for e in entries]
+
+
+def test_aggregate_sensor_circuit_breakers(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the aggregate sensor shows the circuit breaker of each feed."""
+    feed = FeedSource(TEST_FEEDS[0])
+    urls = [feed_server.url_for(feed), feed_server.url_for(feed) + ".missing"]
+    feed_sensor = AggregateFeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"feed_url": urls},
+    )
+
+    async def update(hass: "HomeAssistant") -> None:
+        feed_sensor.hass = hass
+        await feed_sensor.async_update()
+
+    run_with_hass(update)
+    assert feed_sensor.circuit_breaker is None
+    breakers = feed_sensor.circuit_breakers
+    assert list(breakers) == urls
+    assert [breaker.failures for breaker in breakers.values()] == [0, 1]
+    # the entries of the available feed are shown
+    assert feed_sensor.feed_entries
+    attributes = feed_sensor.extra_state_attributes["circuit_breaker"]
+    assert attributes.keys() == set(urls)
+    assert attributes[urls[0]]["state"] == "closed"
+    assert attributes[urls[1]]["failures"] == 1
+
+
+def test_entry_filters(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that only the entries passing the filter are generated and counted."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "nu_nl")
+    titles = [e.title for e in feedparser.parse(feed.path.read_bytes()).entries]
+    show_topn = 5
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed
+        | {
+            "show_topn": show_topn,
+            "entry_exclusions": [
+                {"pattern": re.escape(title), "fields": ["title"]}
+                for title in titles[:3]
+            ],
+        },
+    )
+    generated = []
+    generate_sensor_entry = feed_sensor._generate_sensor_entry  # noqa: SLF001
+
+    def counting_generate(feed_entry: feedparser.FeedParserDict) -> dict[str, Any]:
+        generated.append(feed_entry)
+        return generate_sensor_entry(feed_entry)
+
+    monkeypatch.setattr(feed_sensor, "_generate_sensor_entry", counting_generate)
+    feed_sensor.update()
+    assert feed_sensor.native_value == show_topn
+    assert [e["title"] for e in feed_sensor.feed_entries] == titles[3 : 3 + show_topn]
+    assert len(generated) == show_topn
+
+
+def test_circuit_breaker(feed_server: "FeedServer") -> None:
+    """Test that a failing feed is backed off and its last entries are kept."""
+    feed = FeedSource(TEST_FEEDS[0])
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)},
+    )
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+    breaker = feed_sensor.circuit_breaker
+    assert breaker
+    assert breaker.state == BreakerState.CLOSED
+
+    feed_server.failures = [HTTPStatus.INTERNAL_SERVER_ERROR] * FAILURE_THRESHOLD
+    feed_sensor.update()
+    assert breaker.failures == 1
+    # the feed is not fetched again before the backoff delay passes
+    feed_sensor.update()
+    assert feed_server.statuses == [HTTPStatus.OK, HTTPStatus.INTERNAL_SERVER_ERROR]
+
+    for _ in range(FAILURE_THRESHOLD - 1):
+        breaker.retry_at = None
+        feed_sensor.update()
+    assert breaker.state == BreakerState.OPEN
+    assert feed_sensor.feed_entries == entries
+    attributes = feed_sensor.extra_state_attributes["circuit_breaker"]
+    assert attributes["state"] == "open"
+    assert attributes["failures"] == FAILURE_THRESHOLD
+
+    # the trial fetch after the cooldown closes the breaker
+    breaker.retry_at = None
+    feed_sensor.update()
+    assert breaker.state == BreakerState.CLOSED
+    assert feed_server.statuses[-1] == HTTPStatus.NOT_MODIFIED
+    assert feed_sensor.feed_entries == entries
+
+
+@pytest.mark.parametrize("sensor_cls", [FeedParserSensor, AsyncFeedParserSensor])
+def test_read_timeout(
+    sensor_cls: type[FeedParserSensor],
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that a feed which does not respond in time counts as a failure."""
+    feed = FeedSource(TEST_FEEDS[0])
+    feed_sensor = sensor_cls.from_config(
+        feed.sensor_config_local_feed
+        | {"feed_url": feed_server.url_for(feed), "read_timeout": 0.1},
+    )
+    feed_server.delay = 0.5
+
+    async def update(hass: "HomeAssistant") -> None:
+        feed_sensor.hass = hass
+        await feed_sensor.async_device_update(warning=False)
+
+    run_with_hass(update)
+    assert feed_sensor.circuit_breaker
+    assert feed_sensor.circuit_breaker.failures == 1
+    assert not feed_sensor.feed_entries
+
+
+def test_unchanged_content_not_parsed(
+    feed_sensor: FeedParserSensor,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that a byte-identical feed document is parsed only once."""
+    parse_calls = []
+    parse = coordinator.feedparser.parse
+
+    def counting_parse(*args: object, **kwargs: object) -> feedparser.FeedParserDict:
+        parse_calls.append(args)
+        return parse(*args, **kwargs)
+
+    monkeypatch.setattr(coordinator.feedparser, "parse", counting_parse)
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+    feed_sensor.update()
+    assert len(parse_calls) == 1
+    assert feed_sensor.feed_entries == entries
+    assert feed_sensor.full_parse_count == feed_sensor.skipped_parse_count == 1
+
+    # changing the configuration forces the entries to be regenerated, the parsed
+    # feed is not kept once the sensor got it
+    feed_sensor.local_time = True
+    feed_sensor.update()
+    assert len(parse_calls) == 2  # noqa: PLR2004
+    assert feed_sensor.full_parse_count == 2  # noqa: PLR2004
+
+
+def test_unchanged_entries_reused(
+    feed: FeedSource,
+    tmp_path: "Path",
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that entries which did not change are not generated again."""
+    feed_path = tmp_path / feed.path.name
+    feed_path.write_bytes(feed.path.read_bytes())
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"feed_url": feed_path.as_uri()},
+    )
+    feed_sensor.update()
+    entries = list(feed_sensor.feed_entries)
+
+    # modify the document without touching its entries
+    feed_path.write_bytes(feed.path.read_bytes() + b"\n")
+    generated = []
+    generate_sensor_entry = feed_sensor._generate_sensor_entry  # noqa: SLF001
+
+    def counting_generate_sensor_entry(
+        feed_entry: feedparser.FeedParserDict,
+    ) -> dict[str, str]:
+        generated.append(feed_entry)
+        return generate_sensor_entry(feed_entry)
+
+    monkeypatch.setattr(
+        feed_sensor,
+        "_generate_sensor_entry",
+        counting_generate_sensor_entry,
+    )
+    feed_sensor.update()
+    assert feed_sensor.full_parse_count == 2  # noqa: PLR2004
+    assert feed_sensor.feed_entries == entries
+    # only entries without an id or with a duplicate id are generated again
+    feed_entries = feed_sensor._filter_entries(  # noqa: SLF001
+        feedparser.parse(feed_path.read_bytes()).entries,
+    )[: feed_sensor.native_value]
+    cache_keys = [
+        FeedParserSensor._entry_cache_key(e) for e in feed_entries  # noqa: SLF001
+    ]
+    assert len(generated) == sum(
+        key is None or key in cache_keys[:i] for i, key in enumerate(cache_keys)
+    )
+
+
+@pytest.mark.parametrize("show_topn", [1, 5])
+def test_streaming_parse(
+    feed: FeedSource,
+    feed_server: "FeedServer",
+    show_topn: int,
+) -> None:
+    """Test that the streaming parse yields the same entries as the full parse."""
+    config = feed.sensor_config_local_feed | {
+        "feed_url": feed_server.url_for(feed),
+        "show_topn": show_topn,
+    }
+    feed_sensor = FeedParserSensor.from_config(config)
+    feed_sensor.update()
+    streaming_feed_sensor = FeedParserSensor.from_config(
+        config | {"streaming_parse": True},
+    )
+    streaming_feed_sensor.update()
+    assert streaming_feed_sensor.feed_entries
+    assert streaming_feed_sensor.feed_entries == feed_sensor.feed_entries
+
+
+def test_shared_streaming_parse(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that a feed cut after the entries of a sensor is not shared with others."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "nu_nl")
+    config = feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)}
+    streaming_feed_sensor = FeedParserSensor.from_config(
+        config | {"show_topn": 1, "streaming_parse": True},
+    )
+    feed_sensor = FeedParserSensor.from_config(config)
+
+    async def update(hass: "HomeAssistant") -> None:
+        for updated_sensor in (streaming_feed_sensor, feed_sensor, feed_sensor):
+            updated_sensor.hass = hass
+            await hass.async_add_executor_job(updated_sensor.update)
+
+    run_with_hass(update)
+    # the whole feed is fetched unconditionally, the cut one is not modified
+    assert feed_server.statuses == [
+        HTTPStatus.OK,
+        HTTPStatus.OK,
+        HTTPStatus.NOT_MODIFIED,
+    ]
+    assert streaming_feed_sensor.native_value == 1
+    assert feed_sensor.native_value == len(
+        feedparser.parse(feed.path.read_bytes()).entries,
+    )
+
+
+def test_max_feed_size(feed: FeedSource, feed_server: "FeedServer") -> None:
+    """Test that a feed larger than the size limit is not processed."""
+    config = feed.sensor_config_local_feed | {"feed_url": feed_server.url_for(feed)}
+    feed_sensor = FeedParserSensor.from_config(
+        config | {"max_feed_size": len(feed.path.read_bytes())},
+    )
+    feed_sensor.update()
+    assert feed_sensor.feed_entries
+
+    feed_sensor = FeedParserSensor.from_config(
+        config | {"max_feed_size": len(feed.path.read_bytes()) - 1},
+    )
+    feed_sensor.update()
+    assert not feed_sensor.feed_entries
+    assert feed_sensor.full_parse_count == 0
+
+
+def test_entries_max_size(feed: FeedSource) -> None:
+    """Test that the entries are shortened to fit the size limit of the attribute."""
+    feed_sensor = FeedParserSensor.from_config(feed.sensor_config_local_feed)
+    feed_sensor.update()
+    entries = feed_sensor.feed_entries
+    size = len(json_bytes(entries))
+    entries_without_summaries = [
+        {k: v for k, v in e.items() if k != "summary"} for e in entries
+    ]
+    size_without_summaries = len(json_bytes(entries_without_summaries))
+
+    def fitted_entries(max_size: int) -> FeedParserSensor:
+        fitted_sensor = FeedParserSensor.from_config(
+            feed.sensor_config_local_feed | {"entries_max_size": max_size},
+        )
+        fitted_sensor.update()
+        assert len(json_bytes(fitted_sensor.feed_entries)) <= max_size
+        assert fitted_sensor.native_value == len(fitted_sensor.feed_entries)
+        # the cached entries are not modified
+        assert all(
+            e in entries for e in fitted_sensor._entry_cache.values()  # noqa: SLF001
+        )
+        return fitted_sensor
+
+    assert fitted_entries(size).feed_entries == entries
+    if size_without_summaries < size:
+        # the summaries are shortened first
+        fitted_sensor = fitted_entries((size + size_without_summaries) // 2)
+        assert len(fitted_sensor.feed_entries) == len(entries)
+        assert any(
+            e.get("summary", "").endswith(sensor.SUMMARY_ELLIPSIS)
+            for e in fitted_sensor.feed_entries
+        )
+    # then the summaries are removed and the last entries are dropped
+    fitted_sensor = fitted_entries(len(json_bytes(entries_without_summaries[:1])))
+    assert fitted_sensor.feed_entries == entries_without_summaries[:1]
+
+
+@pytest.mark.parametrize("record_entries", [True, False])
+def test_record_entries(record_entries: bool, run_with_hass: "Callable") -> None:
+    """Test that the entries can be excluded from the recorder."""
+    feed_sensor = FeedParserSensor.from_config(
+        FeedSource(TEST_FEEDS[0]).sensor_config_local_feed
+        | {"record_entries": record_entries},
+    )
+
+    async def add_to_hass(hass: "HomeAssistant") -> None:
+        entity.async_setup(hass)
+        feed_sensor.hass = hass
+        feed_sensor.entity_id = "sensor.feed"
+        feed_sensor.platform = SimpleNamespace(  # type: ignore[assignment]
+            platform_name=sensor.DOMAIN,
+            config_entry=None,
+        )
+        await feed_sensor.async_internal_added_to_hass()
+
+    run_with_hass(add_to_hass)
+    unrecorded_attributes = feed_sensor._state_info[  # noqa: SLF001
+        "unrecorded_attributes"
+    ]
+    assert "diagnostics" in unrecorded_attributes
+    assert ("entries" not in unrecorded_attributes) == record_entries
+
+
+def test_process_pool(feed: FeedSource) -> None:
+    """Test that large feeds are processed in a worker process."""
+    size = len(feed.path.read_bytes())
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"local_time": True},
+    )
+    feed_sensor.update()
+    pooled_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed
+        | {"local_time": True, "process_pool_threshold": size},
+    )
+    submitted = sensor.PROCESS_POOL.submitted
+    pooled_sensor.update()
+    assert sensor.PROCESS_POOL.submitted == submitted + 1
+    assert pooled_sensor._get_coordinator().parse_count == 0  # noqa: SLF001
+    assert pooled_sensor.native_value == feed_sensor.native_value
+    assert pooled_sensor.feed_entries == feed_sensor.feed_entries
+    assert all(type(e) is dict for e in pooled_sensor.feed_entries)
+
+    # smaller feeds are processed in-process
+    small_feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"process_pool_threshold": size + 1},
+    )
+    small_feed_sensor.update()
+    assert sensor.PROCESS_POOL.submitted == submitted + 1
+    assert small_feed_sensor._get_coordinator().parse_count == 1  # noqa: SLF001
+
+
+def test_process_pool_broken(
+    feed: FeedSource,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the feed is processed in-process when the worker was terminated."""
+    feed_sensor = FeedParserSensor.from_config(feed.sensor_config_local_feed)
+    feed_sensor.update()
+    broken: Future = Future()
+    broken.set_exception(BrokenProcessPool())
+    monkeypatch.setattr(sensor.PROCESS_POOL, "submit", lambda *_: broken)
+    pooled_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"process_pool_threshold": 1},
+    )
+    pooled_sensor.update()
+    assert pooled_sensor._get_coordinator().parse_count == 1  # noqa: SLF001
+    assert pooled_sensor.full_parse_count == 1
+    assert pooled_sensor.feed_entries == feed_sensor.feed_entries
+
+
+def test_process_pool_shared_feed(
+    feed_server: "FeedServer",
+    run_with_hass: "Callable",
+) -> None:
+    """Test that the feed shared by a sensor using the worker pool gets parsed."""
+    feed = FeedSource(TEST_FEEDS[0])
+    url = feed_server.url_for(feed)
+    config = feed.sensor_config_local_feed | {"feed_url": url, "local_time": True}
+    pooled_sensor = FeedParserSensor.from_config(config | {"process_pool_threshold": 1})
+    feed_sensor = FeedParserSensor.from_config(config)
+
+    async def update(hass: "HomeAssistant") -> "FeedCoordinator":
+        _start_adding(hass, pooled_sensor, feed_sensor)
+        # the sensor processing the feed in-process polls after the pooled one
+        for updated_sensor in (pooled_sensor, feed_sensor):
+            await hass.async_add_executor_job(updated_sensor.update)
+        return hass.data[sensor.DOMAIN][url]
+
+    feed_coordinator = run_with_hass(update)
+    assert feed_server.statuses == [HTTPStatus.OK]
+    assert feed_coordinator.parse_count == 1
+    assert feed_sensor.feed_entries
+    assert feed_sensor.feed_entries == pooled_sensor.feed_entries
+
+
+@pytest.mark.parametrize(
+    "local_time",
+    [True, False],
+    ids=["local_time", "default_time"],
+)
+def test_dates_from_parsed_values(
+    feed: FeedSource,
+    local_time: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that dates parsed by feedparser are used and give the same result."""
+    config = feed.sensor_config_local_feed | {
+        "date_format": "%Y-%m-%d %H:%M:%S.%f %z %Z",
+        "local_time": local_time,
+    }
+    fallback_sensor = FeedParserSensor.from_config(config)
+    monkeypatch.setattr(fallback_sensor, "_date_from_parsed", lambda *_: None)
+    fallback_sensor.update()
+
+    feed_sensor = FeedParserSensor.from_config(config)
+    monkeypatch.setattr(
+        feed_sensor,
+        "_parse_date",
+        lambda date: pytest.fail(f"Date {date} parsed from the string"),
+    )
+    feed_sensor.update()
+    assert feed_sensor.feed_entries == fallback_sensor.feed_entries
+
+
+@pytest.mark.parametrize(
+    "remove_images",
+    [True, False],
+    ids=["remove_images", "keep_images"],
+)
+def test_summary_processor(
+    feed_with_image_in_summary: FeedSource,
+    remove_images: bool,
+) -> None:
+    """Test that the single pass processing matches the regular expressions."""
+    parsed_feed = feedparser.parse(feed_with_image_in_summary.path.read_bytes())
+    processor = SummaryProcessor(remove_images=remove_images)
+    for entry in parsed_feed.entries:
+        if "summary" not in entry:
+            continue
+        images = re.findall(IMAGE_REGEX, entry.summary)
+        result = processor.process(entry.summary, find_image=True)
+        assert result.image == (images[0] if images else None)
+        assert result.text == (
+            re.sub(IMAGE_REGEX, "", entry.summary) if remove_images else entry.summary
+        )
+
+
+def test_summary_max_length() -> None:
+    """Test that the summary is truncated without leaving a broken tag behind."""
+    processor = SummaryProcessor(remove_images=False, max_length=12)
+    assert processor.process("Short text", find_image=False).text == "Short text"
+    assert processor.process("Longer text here", find_image=False).text == (
+        "Longer text…"
+    )
+    result = processor.process('Text <img src="a.png" alt="">', find_image=True)
+    assert result.text == "Text…"
+    assert result.image == "a.png"
+
+
+def test_projection(feed: FeedSource) -> None:
+    """Test that sensor entries contain only the included keys."""
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed
+        | {
+            "inclusions": ["title", "summary", "description", "published_parsed"],
+            "exclusions": ["summary", "link"],
+        },
+    )
+    feed_sensor.update()
+    assert feed_sensor.feed_entries
+    assert all(set(e) == {"title"} for e in feed_sensor.feed_entries)
+
+    feed_sensor = FeedParserSensor.from_config(
+        feed.sensor_config_local_feed | {"inclusions": [], "exclusions": ["title"]},
+    )
+    feed_sensor.update()
+    assert all("title" not in e for e in feed_sensor.feed_entries)
+    assert all("published_parsed" not in e for e in feed_sensor.feed_entries)
+    assert any("summary" in e for e in feed_sensor.feed_entries)
+
+
+def test_entries_max_size_seen_flags() -> None:
+    """Test that the entries fit the size limit together with their seen flags."""
+    feed = next(f for f in map(FeedSource, TEST_FEEDS) if f.name == "nu_nl")
+    config = feed.sensor_config_local_feed | {"seen_index_size": 100}
+    feed_sensor = FeedParserSensor.from_config(config)
+    feed_sensor.update()
+    max_size = len(json_bytes(feed_sensor.feed_entries)) - 1
+    fitted_sensor = FeedParserSensor.from_config(
+        config | {"entries_max_size": max_size},
+    )
+    fitted_sensor.update()
+    assert fitted_sensor.feed_entries
+    assert all(e["is_new"] for e in fitted_sensor.feed_entries)
+    assert len(json_bytes(fitted_sensor.feed_entries)) <= max_size
+
+    # the entries fitted in a worker process make room for the flags as well
+    pooled_sensor = FeedParserSensor.from_config(
+        config | {"entries_max_size": max_size, "process_pool_threshold": 1},
+    )
+    submitted = sensor.PROCESS_POOL.submitted
+    pooled_sensor.update()
+    assert sensor.PROCESS_POOL.submitted == submitted + 1
+    assert len(pooled_sensor.feed_entries) == len(fitted_sensor.feed_entries)
+    assert len(json_bytes(pooled_sensor.feed_entries)) <= max_size
+
+
+def test_setup_platform(
+    feed: FeedSource,
+    run_with_hass: "Callable",
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that the sensor is created from the validated platform config."""
+    config = sensor.PLATFORM_SCHEMA(
+        feed.ha_config_entry | {"summary_max_length": 100},
+    )
+    added: list[FeedParserSensor] = []
+    closed: list[object] = []
+    for pool in (sensor.PROCESS_POOL, sensor.SESSION_POOL):
+        monkeypatch.setattr(pool, "close", partial(closed.append, pool))
+
+    async def setup(hass: "HomeAssistant") -> None:
+        for _ in range(2):
+            await sensor.async_setup_platform(
+                hass,
+                config,
+                lambda entities, **_: added.extend(entities),
+            )
+        assert not closed
+
+    run_with_hass(setup)
+    # the shared pools are closed once when Home Assistant stops
+    assert closed == [sensor.PROCESS_POOL, sensor.SESSION_POOL]
+    assert len(added) == 2  # noqa: PLR2004
+    assert isinstance(added[0], FeedParserSensor)
+    assert added[0].name == feed.name
+    assert "summary_max_length=100" in repr(added[0])
+
+
+def test_setup_aggregate_platform(
+    feed: FeedSource,
+    run_with_hass: "Callable",
+) -> None:
+    """Test that a sensor with multiple feed URLs merges the feeds."""
+    config = feed.ha_config_entry | {"feed_url": [feed.url, feed.url + "?page=2"]}
+    added: list[FeedParserSensor] = []
+    run_with_hass(
+        partial(
+            sensor.async_setup_platform,
+            config=sensor.PLATFORM_SCHEMA(config),
+            async_add_devices=lambda entities, **_: added.extend(entities),
+        ),
+    )
+    assert len(added) == 1
+    assert isinstance(added[0], AggregateFeedParserSensor)
+
+    with pytest.raises(vol.Invalid, match="persist_entries"):
+        sensor.PLATFORM_SCHEMA(config | {"persist_entries": True})
+
+
+def test_entry_filters_schema() -> None:
+    """Test that the invalid filter rules are rejected by the schema."""
+    config = {"platform": "feedparser", "name": "test", "feed_url": "/"}
+    validated = sensor.PLATFORM_SCHEMA(
+        config | {"entry_inclusions": ["storm", {"pattern": "rain"}]},
+    )
+    assert validated["entry_exclusions"] == []
+    # the valid rules can be combined with the others by the sensor
+    rules = ["(?i)storm", r"(rain) \1"]
+    validated = sensor.PLATFORM_SCHEMA(config | {"entry_exclusions": rules})
+    FeedParserSensor.from_config(
+        FeedSource(TEST_FEEDS[0]).sensor_config_local_feed
+        | {
+            "entry_inclusions": validated["entry_inclusions"],
+            "entry_exclusions": validated["entry_exclusions"],
+        },
+    )
+    for rules in ("(", [{"pattern": "rain", "fields": ["link"]}]):
+        with pytest.raises(vol.Invalid):
+            sensor.PLATFORM_SCHEMA(config | {"entry_exclusions": rules})
@@ -0,0 +1,72 @@
+"""Tests incremental reading of feed documents."""
+import feedparser
+import pytest
+from constants import DATA_PATH
+from feedsource import FeedSource
+
+from custom_components.feedparser.stream import (
+    CHUNK_SIZE,
+    ContentReader,
+    FeedTooLargeError,
+)
+
+
+def read(reader: ContentReader, content: bytes, chunk_size: int = CHUNK_SIZE) -> int:
+    """Feed content to the reader in chunks, return number of bytes consumed."""
+    for start in range(0, len(content), chunk_size):
+        if reader.feed(content[start : start + chunk_size]):
+            return start + chunk_size
+    return len(content)
+
+
+@pytest.mark.parametrize("max_entries", [1, 3])
+def test_content_truncated_after_entries(feed: FeedSource, max_entries: int) -> None:
+    """Test that the truncated document contains the first N entries of the feed."""
+    content = feed.path.read_bytes()
+    reader = ContentReader(max_entries=max_entries)
+    read(reader, content, chunk_size=1024)
+    parsed_feed = feedparser.parse(content)
+    truncated_feed = feedparser.parse(reader.content)
+    assert not truncated_feed.bozo
+    assert truncated_feed.feed == parsed_feed.feed
+    assert truncated_feed.entries == parsed_feed.entries[:max_entries]
+    assert reader.done == (len(parsed_feed.entries) >= max_entries)
+
+
+def test_reading_stops_early() -> None:
+    """Test that a large feed is not read completely when only one entry is needed."""
+    content = (DATA_PATH / "ct24.xml").read_bytes()
+    reader = ContentReader(max_entries=1)
+    assert read(reader, content) < len(content) / 10
+    assert reader.done
+
+
+def test_content_not_scanned_without_max_entries() -> None:
+    """Test that the whole document is passed through unchanged by default."""
+    content = (DATA_PATH / "zive.xml").read_bytes()
+    reader = ContentReader()
+    assert read(reader, content) == len(content)
+    assert not reader.done
+    assert reader.content == content
+
+
+def test_malformed_content_passed_through() -> None:
+    """Test that a document which is not well-formed XML is read completely."""
+    content = b"<rss><channel><item><title>&nbsp;</title></item><item/></channel>"
+    reader = ContentReader(max_entries=1)
+    assert read(reader, content, chunk_size=8) == len(content)
+    assert reader.content == content
+
+
+def test_size_limit() -> None:
+    """Test that reading a document over the size limit fails."""
+    content = (DATA_PATH / "zive.xml").read_bytes()
+    reader = ContentReader(max_size=len(content))
+    reader.check_size(len(content))
+    assert read(reader, content) == len(content)
+
+    reader = ContentReader(max_size=len(content) - 1)
+    with pytest.raises(FeedTooLargeError):
+        reader.check_size(str(len(content)))
+    with pytest.raises(FeedTooLargeError):
+        read(reader, content)
@@ -0,0 +1,22 @@
+"""Tests the pool of worker processes."""
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from custom_components.feedparser.worker import ProcessPool
+
+
+def test_terminated_worker_restarted() -> None:
+    """Test that the workers are restarted after one of them was terminated."""
+    pool = ProcessPool(max_workers=1)
+    try:
+        first_pid = pool.submit(os.getpid).result()
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result()  # noqa: SLF001
+        second_pid = pool.submit(os.getpid).result()
+    finally:
+        pool.close()
+    assert first_pid != second_pid != os.getpid()
+    assert pool.submitted == 3  # noqa: PLR2004
+    assert repr(pool) == "ProcessPool(max_workers=1, started=False)"